@@ -0,0 +1,211 @@
+"""Benchmarks for the storage and query paths at different history sizes.
+
+    python -m benchmarks.run                        # 100, 10k and 1M sets
+    python -m benchmarks.run --sizes 100 10000 --compare benchmarks/results/<earlier>.json
+
+Each size runs against generated data in a temporary directory, never the
+real data/ folder. Results are written as JSON to benchmarks/results/ so
+runs can be compared; --compare exits with 1 when something got slower than
+REGRESSION_RATIO times the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks.workload import generate
+from modules import exercises, logs, series, stats, workout
+from utils import json_handler, repository
+from utils.json_handler import flush_pending, load_json, save_json
+
+SIZES = (100, 10_000, 1_000_000)
+RESULTS_DIR = Path(__file__).parent / "results"
+# A timing this many times the baseline's median counts as a regression,
+# if it also got at least REGRESSION_MIN_MS slower (sub-millisecond timings are mostly noise)
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_MS = 1.0
+QUERIES = ("press", "dumbell", "squat", "incline cable", "row")
+
+
+def _measure(func, repeat=5):
+    """Run func repeat times; timings in ms."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": min(times),
+        "median_ms": statistics.median(times),
+        "mean_ms": statistics.fmean(times),
+        "max_ms": max(times),
+    }
+
+def _cold(func):
+    """Time one call right after dropping every cached file, so parsing/index building is included."""
+    def run():
+        repository.invalidate()
+        func()
+    return run
+
+def _new_workout(workouts, exercise_ids, i):
+    when = datetime.fromisoformat(workouts[-1]["id"]) + timedelta(hours=8 * (i + 1))
+    return {
+        "id": when.isoformat(timespec="seconds"),
+        "date": when.strftime("%Y-%m-%d"),
+        "exercises": [
+            {"exercise_id": ex_id, "title": ex_id, "sets": [{"weight": 60.0, "reps": 8}] * 3}
+            for ex_id in exercise_ids[:4]
+        ],
+    }
+
+def bench_size(total_sets, seed=0):
+    exercise_data, workout_data = generate(total_sets, seed)
+    timings = {}
+    # big histories get fewer repetitions of the slow, whole-file operations
+    repeat = 5 if total_sets <= 100_000 else 2
+
+    timings["save_json.exercises"] = _measure(lambda: save_json(exercises.EXERCISE_FILE, exercise_data), repeat)
+    timings["save_json.workouts"] = _measure(lambda: save_json(workout.WORKOUT_FILE, workout_data), repeat)
+    timings["load_json.exercises"] = _measure(lambda: load_json(exercises.EXERCISE_FILE), repeat)
+    timings["load_json.workouts"] = _measure(lambda: load_json(workout.WORKOUT_FILE), repeat)
+    compact_file = Path("compact.json")
+    timings["save_json.workouts_compact"] = _measure(lambda: save_json(compact_file, workout_data, compact=True), repeat)
+    timings["load_json.workouts_compact"] = _measure(lambda: load_json(compact_file), repeat)
+    if json_handler.msgpack is not None:
+        msgpack_file = Path("archive.msgpack")
+        timings["save_json.workouts_msgpack"] = _measure(lambda: save_json(msgpack_file, workout_data), repeat)
+        timings["load_json.workouts_msgpack"] = _measure(lambda: load_json(msgpack_file), repeat)
+
+    timings["search_exercises.cold"] = _measure(_cold(lambda: exercises.search_exercises("press")), repeat)
+    exercises.search_exercises(None)
+    timings["search_exercises.warm"] = _measure(lambda: [exercises.search_exercises(q) for q in QUERIES], 20)
+    timings["search_exercises.tags"] = _measure(
+        lambda: exercises.search_exercises(None, all_tags=["compound"], no_tags=["legs"]), 20)
+    timings["get_all_tags"] = _measure(exercises.get_all_tags, 20)
+
+    ids = [ex["id"] for ex in exercise_data]
+    timings["get_previous_sets.reindex"] = _measure(_cold(workout.rebuild_latest_sets_index), repeat)
+    timings["get_previous_sets.warm"] = _measure(lambda: [workout.get_previous_sets(i) for i in ids], 20)
+
+    timings["logs.get_logged_exercises"] = _measure(workout.get_logged_exercises, repeat)
+    timings["logs.index_rebuild"] = _measure(logs.rebuild, repeat)
+    timings["logs.page"] = _measure(lambda: logs.page(logs.page()[1]), 20)
+    timings["logs.series_rebuild"] = _measure(series.rebuild, repeat)
+    timings["stats.rebuild"] = _measure(lambda: stats.StatsEngine(columns=stats.history_columns()), repeat)
+    timings["logs.series_rebuild_rollups"] = _measure(
+        lambda: [s.rollup(p) for s in series.rebuild().values() for p in ("week", "month")], repeat)
+
+    added = iter(range(repeat))
+    timings["add_workout"] = _measure(lambda: workout.add_workout(_new_workout(workout_data, ids, next(added))), repeat)
+    flush_pending()
+    workouts_bytes = os.path.getsize(workout.WORKOUT_FILE)
+
+    # the same queries against the columnar archive (this moves the history into it)
+    timings["archive.write"] = _measure(workout.archive_workouts, 1)
+    timings["archive.load"] = _measure(_cold(workout.load_workout), repeat)
+    timings["archive.series_rebuild"] = _measure(series.rebuild, repeat)
+    timings["archive.stats_rebuild"] = _measure(lambda: stats.StatsEngine(columns=stats.history_columns()), repeat)
+    added = iter(range(repeat, 2 * repeat))
+    timings["archive.add_workout"] = _measure(
+        lambda: workout.add_workout(_new_workout(workout_data, ids, next(added))), repeat)
+    timings["archive.merge"] = _measure(workout.merge_archive, 1)
+
+    return {
+        "sets": total_sets,
+        "workouts": len(workout_data),
+        "exercises": len(exercise_data),
+        "workouts_bytes": workouts_bytes,
+        "timings": timings,
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes=SIZES, seed=0):
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "orjson": json_handler.orjson is not None,
+        },
+        "sizes": {},
+    }
+    cwd = os.getcwd()
+    for total_sets in sizes:
+        # the modules use paths relative to the working directory (data/...)
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            Path("data").mkdir()
+            try:
+                repository.invalidate()
+                print(f"{total_sets} sets...", file=sys.stderr)
+                results["sizes"][str(total_sets)] = bench_size(total_sets, seed)
+            finally:
+                os.chdir(cwd)
+    repository.invalidate()
+    return results
+
+def compare(results, baseline, ratio=REGRESSION_RATIO):
+    """Lines describing timings that got slower than ratio x baseline median."""
+    regressions = []
+    for size, entry in results["sizes"].items():
+        base_timings = baseline.get("sizes", {}).get(size, {}).get("timings", {})
+        for name, timing in entry["timings"].items():
+            base = base_timings.get(name)
+            if not base:
+                continue
+            slower = timing["median_ms"] - base["median_ms"]
+            if timing["median_ms"] > base["median_ms"] * ratio and slower >= REGRESSION_MIN_MS:
+                regressions.append(f"{size} sets, {name}: {base['median_ms']:.2f} ms -> {timing['median_ms']:.2f} ms")
+    return regressions
+
+def format_results(results):
+    lines = []
+    for size, entry in results["sizes"].items():
+        lines.append(f"{size} sets ({entry['workouts']} workouts, {entry['exercises']} exercises, "
+                     f"{entry['workouts_bytes'] / 1e6:.1f} MB)")
+        for name, timing in entry["timings"].items():
+            lines.append(f"  {name:<32} {timing['median_ms']:10.2f} ms")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GymLog storage/query benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="history sizes in sets")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to check for regressions")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.seed)
+    out = args.out or RESULTS_DIR / f"{results['meta']['timestamp'].replace(':', '')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=4), encoding="utf-8")
+    print(format_results(results))
+    print(f"Results written to {out}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text(encoding="utf-8")))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
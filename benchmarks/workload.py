@@ -0,0 +1,99 @@
+import random
+from datetime import datetime, timedelta
+
+from modules.exercises import normalize_exercise_data
+
+# Building blocks for exercise titles, e.g. "Incline Dumbbell Bench Press"
+MOVEMENTS = {
+    "Bench Press": ["chest", "push", "compound"],
+    "Squat": ["legs", "compound"],
+    "Deadlift": ["legs", "compound", "lower-back"],
+    "Overhead Press": ["shoulders", "push", "compound"],
+    "Row": ["back", "pull", "compound"],
+    "Pull Up": ["back", "pull", "bodyweight"],
+    "Curl": ["arms", "pull", "isolation"],
+    "Tricep Extension": ["arms", "push", "isolation"],
+    "Lunge": ["legs", "unilateral"],
+    "Lateral Raise": ["shoulders", "isolation"],
+    "Calf Raise": ["legs", "isolation"],
+    "Hip Thrust": ["glutes", "legs"],
+    "Fly": ["chest", "isolation"],
+    "Shrug": ["back", "isolation"],
+    "Crunch": ["core", "bodyweight"],
+}
+VARIANTS = ["", "Incline", "Decline", "Seated", "Standing", "Paused", "Close Grip", "Wide Grip", "Single Arm", "Tempo"]
+EQUIPMENT = ["Barbell", "Dumbbell", "Cable", "Machine", "Kettlebell", "Smith Machine", "Band"]
+
+SETS_PER_EXERCISE = (3, 5)
+EXERCISES_PER_WORKOUT = (3, 7)
+START = datetime(2015, 1, 5, 7, 0)
+
+
+def exercise_count(total_sets):
+    """A library size that grows with the history: 20 exercises minimum, 1000 at most."""
+    return min(1000, max(20, total_sets // 1000))
+
+def make_exercises(count, rng):
+    """count distinct exercises, shaped like normalize_exercise_data() output."""
+    titles = set()
+    movements = list(MOVEMENTS)
+    while len(titles) < count:
+        parts = [rng.choice(VARIANTS), rng.choice(EQUIPMENT), rng.choice(movements)]
+        titles.add(" ".join(p for p in parts if p))
+
+    exercises = []
+    for title in sorted(titles):
+        movement = next(m for m in movements if title.endswith(m))
+        tags = list(MOVEMENTS[movement]) + rng.sample(["beginner", "strength", "hypertrophy", "home"], rng.randint(0, 2))
+        weight = round(rng.uniform(10, 100) / 2.5) * 2.5
+        exercises.append(normalize_exercise_data({
+            "title": title,
+            "description": f"{title} for {', '.join(tags[:2])}",
+            "tags": tags,
+            "weight": {"has": True, "default": weight, "goal": weight * 1.25, "unit": "kg"},
+            "reps": {"has": True, "default": 8, "goal": 10},
+            "sets": {"has": True, "default": 3, "goal": 4},
+            "created_at": START.isoformat(timespec="seconds"),
+        }))
+    return exercises
+
+def make_workouts(exercises, total_sets, rng):
+    """Workouts as WorkoutTab.add_exercise() + add_workout() build them, totalling total_sets sets.
+
+    Weights slowly progress per exercise, with noise; workouts are 8 hours apart.
+    """
+    working = {ex["id"]: ex["weight"]["default"] for ex in exercises}
+    workouts = []
+    when = START
+    sets_left = total_sets
+    while sets_left > 0:
+        workout_exercises = []
+        for ex in rng.sample(exercises, min(len(exercises), rng.randint(*EXERCISES_PER_WORKOUT))):
+            if sets_left <= 0:
+                break
+            n = min(sets_left, rng.randint(*SETS_PER_EXERCISE))
+            base = working[ex["id"]]
+            sets = [
+                {"weight": max(2.5, round((base + rng.gauss(0, 2.5)) / 2.5) * 2.5), "reps": rng.randint(5, 12)}
+                for _ in range(n)
+            ]
+            working[ex["id"]] = base + rng.choice([0, 0, 0, 2.5])
+            workout_exercises.append({"exercise_id": ex["id"], "title": ex["title"], "sets": sets})
+            sets_left -= n
+
+        stamp = when.isoformat(timespec="seconds")
+        workouts.append({
+            "id": stamp,
+            "date": when.strftime("%Y-%m-%d"),
+            "exercises": workout_exercises,
+            "created_at": stamp,
+            "last_updated": stamp,
+        })
+        when += timedelta(hours=8)
+    return workouts
+
+def generate(total_sets, seed=0):
+    """(exercises, workouts) with about total_sets logged sets, reproducible for a given seed."""
+    rng = random.Random(seed)
+    exercises = make_exercises(exercise_count(total_sets), rng)
+    return exercises, make_workouts(exercises, total_sets, rng)
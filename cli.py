@@ -0,0 +1,68 @@
+"""GymLog without the window: bulk import, export and reports.
+
+    python cli.py import workouts.csv           # or .jsonl / .json, one write for the whole file
+    python cli.py export out.jsonl --from 2025-01-01 --to 2025-03-31 --exercise <exercise_id>
+    python cli.py sets sets.csv --tag legs     # one row per set: .csv, .jsonl, or a directory of .npz chunks
+    python cli.py report --weeks 12
+
+Run from the repo folder, like main.py: the data files are found under data/.
+"""
+import argparse
+import sys
+from datetime import date
+
+from utils import tasks
+from utils.json_handler import flush_pending
+from modules import export, service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GymLog command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="add workouts from a CSV, JSONL or JSON file")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=sorted(set(service.FORMATS.values())))
+
+    exporter = commands.add_parser("export", help="write workouts to a JSONL or JSON file")
+    exporter.add_argument("path")
+    exporter.add_argument("--format", choices=["jsonl", "json"])
+    exporter.add_argument("--from", dest="start", type=date.fromisoformat, help="first date, YYYY-MM-DD")
+    exporter.add_argument("--to", dest="end", type=date.fromisoformat, help="last date, YYYY-MM-DD")
+    exporter.add_argument("--exercise", action="append", help="exercise id to keep (repeatable)")
+
+    sets = commands.add_parser("sets", help="stream one row per set to CSV, JSONL or .npz chunks")
+    sets.add_argument("path", help="a .csv or .jsonl file, anything else is a directory of chunks")
+    sets.add_argument("--format", choices=export.FORMATS)
+    sets.add_argument("--from", dest="start", type=date.fromisoformat, help="first date, YYYY-MM-DD")
+    sets.add_argument("--to", dest="end", type=date.fromisoformat, help="last date, YYYY-MM-DD")
+    sets.add_argument("--exercise", action="append", help="exercise id to keep (repeatable)")
+    sets.add_argument("--tag", action="append", help="keep exercises with this tag (repeatable)")
+
+    reporter = commands.add_parser("report", help="print totals, recent weeks and records")
+    reporter.add_argument("--weeks", type=int, default=8)
+    reporter.add_argument("--top", type=int, default=10, help="number of exercises to list")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "import":
+            print(f"Imported {service.import_workouts(args.path, args.format)} workouts from {args.path}")
+        elif args.command == "export":
+            count = service.export_workouts(args.path, args.start, args.end, args.exercise, args.format)
+            print(f"Exported {count} workouts to {args.path}")
+        elif args.command == "sets":
+            count = export.export_sets(args.path, args.format, args.exercise, args.tag, args.start, args.end)
+            print(f"Exported {count} sets to {args.path}")
+        else:
+            print(service.report(weeks=args.weeks, top=args.top))
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        tasks.shutdown()   # e.g. an archive merge the import kicked off
+        flush_pending()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
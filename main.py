@@ -1,9 +1,20 @@
+from utils import startup  # first, so the startup clock includes every import below
+
+import importlib
 import tkinter as tk
 from tkinter import ttk
 
-from tabs.exercises_tab import ExercisesTab
-from tabs.workout_tab import WorkoutTab
-from tabs.logs_tab import LogsTab
+from utils import instrument, tasks
+from utils.json_handler import flush_pending, set_flush_scheduler
+
+# (tab text, module, class); a tab's module is imported and the tab built the first time it's selected,
+# so e.g. matplotlib is only loaded once the Logs tab is opened
+TABS = [
+    ("Exercise Bank", "tabs.exercises_tab", "ExercisesTab"),
+    ("Workout Tracker", "tabs.workout_tab", "WorkoutTab"),
+    ("Logs", "tabs.logs_tab", "LogsTab"),
+]
+START_TAB = 1
 
 # ---------- MAIN ----------
 class GymLogApp(tk.Tk):
@@ -15,6 +26,10 @@ class GymLogApp(tk.Tk):
         self.minsize(500, 500)
         self.resizable(False, False)
 
+        # Delayed saves are flushed on the Tk loop, and written out before closing
+        set_flush_scheduler(lambda delay, callback: self.after(int(delay * 1000), callback))
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Style
         style = ttk.Style(self)
         #self.configure(bg="#f7f7f7")
@@ -24,27 +39,48 @@ class GymLogApp(tk.Tk):
         self.tab_control = ttk.Notebook(self)
         self.tab_control.pack(expand=1, fill="both")
 
-        # Add tabs
-        self.tabs = [
-            ("Exercise Bank", ExercisesTab(self.tab_control)),
-            ("Workout Tracker", WorkoutTab(self.tab_control)),
-            ("Logs", LogsTab(self.tab_control)),
-        ]
-
-        for text, frame in self.tabs:
+        # Add tabs: empty placeholder frames, filled in by build_tab()
+        self.tabs = []
+        self.built = {}   # placeholder frame -> tab instance
+        for text, module, class_name in TABS:
+            frame = ttk.Frame(self.tab_control)
+            self.tabs.append((text, frame, module, class_name))
             self.tab_control.add(frame, text=text)
 
         # Configure tab style to stretch and start in the middle tab
         self.style = style
-        self.tab_control.select(1)
+        self.tab_control.select(START_TAB)
+        self.build_tab(self.tabs[START_TAB][1])
         self.update_tab_widths()
         self.tab_control.bind("<Configure>", self.on_resize)  # update widths on resize 
         self.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_change)
     
+        if startup.enabled():
+            self.after_idle(lambda: print(startup.report()))
+
+    def build_tab(self, frame):
+        """Build the tab behind a placeholder frame, once. Returns (tab, newly_built)."""
+        if frame in self.built:
+            return self.built[frame], False
+        text, _, module, class_name = next(t for t in self.tabs if t[1] is frame)
+        with startup.timed(f"import {module}"):
+            cls = getattr(importlib.import_module(module), class_name)
+        with startup.timed(f"build {text} tab"):
+            tab = cls(frame)
+            tab.pack(expand=1, fill="both")
+        self.built[frame] = tab
+        return tab, True
+
+    def on_close(self):
+        tasks.shutdown()   # let a workout that's still being saved finish first
+        flush_pending()
+        self.destroy()
+
     def on_tab_change(self, event):
         selected_tab = event.widget.select()
-        tab = event.widget.nametowidget(selected_tab)
-        if isinstance(tab, LogsTab):
+        tab, new = self.build_tab(event.widget.nametowidget(selected_tab))
+        # a freshly built tab already shows current data
+        if not new and hasattr(tab, "exercise_select"):
             tab.exercise_select()
 
     def update_tab_widths(self):
@@ -60,5 +96,9 @@ class GymLogApp(tk.Tk):
 
 
 if __name__ == "__main__":
-    app = GymLogApp()
+    # --profile / GYMLOG_PROFILE=1: cProfile + tracemalloc for the session, report written on exit
+    if instrument.enabled():
+        instrument.start()
+    with startup.timed("build window"):
+        app = GymLogApp()
     app.mainloop()  
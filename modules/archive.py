@@ -0,0 +1,230 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+from utils.json_handler import load_json, save_json
+from modules.models import SetColumns, workouts_from_json, workouts_to_json
+
+# Columnar archive of the workout history: one .npy file per column, opened
+# memory-mapped, so the sets are never parsed and only the columns a caller
+# touches are paged in. Everything that isn't a set (ids, dates, titles, ...)
+# is kept in the segment's meta file, with each entry's sets replaced by the
+# row range they occupy in the columns.
+#
+#   data/archive/current.json    {"segment": name of the live segment directory}
+#   data/archive/<segment>/      meta.json + the column files below
+#   data/archive/delta.jsonl     workouts added/edited/removed since, as a journal
+#
+# Merging the delta writes a new segment and then switches current.json over,
+# so readers never see a half-written archive.
+#
+# numpy is imported inside the functions that read or write columns: modules.workout
+# imports this module, and the app shouldn't pay for numpy on start-up just to
+# learn that there's no archive.
+ARCHIVE_DIR = Path("data/archive")
+CURRENT_FILE = ARCHIVE_DIR / "current.json"
+DELTA_FILE = ARCHIVE_DIR / "delta.jsonl"
+META_FILE = "meta.json"
+
+# Per-set columns, in the layout of stats.flatten()
+SET_COLUMNS = {
+    "timestamp": "datetime64[s]",   # the workout's (from its id)
+    "workout": "int32",             # index into the segment's workouts
+    "entry": "int32",               # running index of the (workout, exercise) entry
+    "exercise": "int32",            # index into the segment's exercise_ids
+    "weight": "float64",
+    "reps": "uint16",
+}
+# One row per workout
+WORKOUT_COLUMNS = {"workout_timestamp": "datetime64[s]"}
+ROWS = "_rows"   # [start, stop) rows of an entry's sets, in the meta entries
+
+
+def exists():
+    return CURRENT_FILE.exists()
+
+def _timestamp(workout):
+    import numpy as np
+    try:
+        return np.datetime64(workout["id"], "s")
+    except (KeyError, TypeError, ValueError):
+        return np.datetime64("NaT", "s")
+
+def _set_rows(sets):
+    """(weights, reps, exact) to store as rows, or None if the sets aren't numbers that fit the columns.
+
+    exact is False when the sets can't be rebuilt from the rows alone (e.g. int weights, extra keys).
+    """
+    packed = SetColumns.pack(sets)
+    if packed is not None:
+        return packed.weights, packed.reps, True
+    try:
+        weights = [float(s["weight"]) for s in sets]
+        reps = [s["reps"] for s in sets]
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not all(type(r) is int and 0 <= r <= 0xFFFF for r in reps):
+        return None
+    return weights, reps, False
+
+
+# ---------- WRITING ----------
+def _segment_names():
+    return sorted(p.name for p in ARCHIVE_DIR.iterdir() if p.is_dir() and p.name.isdigit()) if ARCHIVE_DIR.exists() else []
+
+def write_archive(workouts):
+    """Write workouts (models or dicts) as a new segment and make it the current one."""
+    import numpy as np
+    meta_workouts = []
+    codes = {}
+    columns = {name: [] for name in SET_COLUMNS}
+    workout_ts = []
+    entry_index = 0
+    inline_entries = 0   # entries with sets the columns can't hold
+    for i, workout in enumerate(workouts_to_json(workouts)):
+        timestamp = _timestamp(workout) if isinstance(workout, dict) else np.datetime64("NaT", "s")
+        workout_ts.append(timestamp)
+        if isinstance(workout, dict) and isinstance(workout.get("exercises"), list):
+            # copies: plain dicts passed in belong to the caller
+            workout = dict(workout, exercises=[dict(e) if isinstance(e, dict) else e for e in workout["exercises"]])
+        meta_workouts.append(workout)
+        for entry in workout.get("exercises", []) if isinstance(workout, dict) else []:
+            if not isinstance(entry, dict):
+                continue
+            code = codes.setdefault(entry.get("exercise_id"), len(codes))
+            rows = _set_rows(entry["sets"]) if isinstance(entry.get("sets"), list) and entry["sets"] else None
+            if rows is None:
+                inline_entries += bool(entry.get("sets"))
+                continue   # stays inline in the meta file only
+            weights, reps, exact = rows
+            start = len(columns["weight"])
+            columns["timestamp"].extend([timestamp] * len(reps))
+            columns["workout"].extend([i] * len(reps))
+            columns["entry"].extend([entry_index] * len(reps))
+            columns["exercise"].extend([code] * len(reps))
+            columns["weight"].extend(weights)
+            columns["reps"].extend(reps)
+            entry_index += 1
+            entry[ROWS] = [start, start + len(reps)]
+            if exact:
+                del entry["sets"]   # rebuilt from the rows exactly
+
+    names = _segment_names()
+    name = f"{int(names[-1]) + 1 if names else 1:06d}"
+    segment = ARCHIVE_DIR / name
+    segment.mkdir(parents=True)
+    for column, dtype in SET_COLUMNS.items():
+        np.save(segment / f"{column}.npy", np.array(columns[column], dtype=dtype))
+    np.save(segment / "workout_timestamp.npy", np.array(workout_ts, dtype=WORKOUT_COLUMNS["workout_timestamp"]))
+    meta = {"exercise_ids": list(codes), "entries": entry_index, "inline_entries": inline_entries,
+            "workouts": meta_workouts}
+    save_json(segment / META_FILE, meta, compact=True)
+
+    previous = load_json(CURRENT_FILE).get("segment") if exists() else None
+    save_json(CURRENT_FILE, {"segment": name})
+    # older segments go, except the one just replaced: the loaded history may still map it
+    # (where mapped files can't be removed, e.g. on Windows, they're left for the next merge)
+    for old in names:
+        if old != previous:
+            shutil.rmtree(ARCHIVE_DIR / old, ignore_errors=True)
+    return name
+
+
+# ---------- READING ----------
+class Segment:
+    """One written archive: meta data plus lazily memory-mapped columns."""
+
+    def __init__(self, name):
+        self.name = name
+        self.directory = (ARCHIVE_DIR / name).resolve()
+        meta = load_json(self.directory / META_FILE)
+        self.exercise_ids = meta["exercise_ids"]
+        self.entries = meta["entries"]
+        self.inline_entries = meta.get("inline_entries", 0)
+        self._workouts = meta["workouts"]
+        self._ids = None
+        self._columns = {}
+
+    def __len__(self):
+        return len(self._workouts)
+
+    def column(self, name):
+        """Read-only memory-mapped column (see SET_COLUMNS / WORKOUT_COLUMNS)."""
+        if name not in self._columns:
+            if name not in SET_COLUMNS and name not in WORKOUT_COLUMNS:
+                raise KeyError(name)
+            import numpy as np
+            self._columns[name] = np.load(self.directory / f"{name}.npy", mmap_mode="r")
+        return self._columns[name]
+
+    def columns(self, names=None):
+        return {name: self.column(name) for name in (names or [*SET_COLUMNS, *WORKOUT_COLUMNS])}
+
+    def ids(self):
+        if self._ids is None:
+            self._ids = {w["id"] for w in self._workouts if isinstance(w, dict) and "id" in w}
+        return self._ids
+
+    def workouts(self):
+        """Workout models whose packed sets are views on the mapped weight/reps columns."""
+        import numpy as np
+        # plain ndarray views on the same mapping: slicing a np.memmap is several times slower
+        weight, reps = self.column("weight").view(np.ndarray), self.column("reps").view(np.ndarray)
+        workouts = []
+        for item in self._workouts:
+            if isinstance(item, dict) and isinstance(item.get("exercises"), list):
+                item = dict(item, exercises=[_restore(entry, weight, reps) for entry in item["exercises"]])
+            workouts.append(item)
+        return workouts_from_json(workouts)
+
+def _restore(entry, weight, reps):
+    if not isinstance(entry, dict) or ROWS not in entry:
+        return entry
+    entry = dict(entry)
+    start, stop = entry.pop(ROWS)
+    if "sets" not in entry:
+        entry["sets"] = SetColumns(weight[start:stop], reps[start:stop])
+    return entry
+
+
+_segment = None
+
+
+def current():
+    """The live Segment, reopened when a merge switched to a new one. None if there's no archive."""
+    global _segment
+    if not exists():
+        return None
+    name = load_json(CURRENT_FILE)["segment"]
+    # compare directories, not names: every data folder numbers its segments from 1
+    if _segment is None or _segment.directory != (ARCHIVE_DIR / name).resolve():
+        _segment = Segment(name)
+    return _segment
+
+def touched_ids(path=DELTA_FILE):
+    """Ids of every workout the delta adds, edits or removes."""
+    ids = set()
+    if not Path(path).exists():
+        return ids
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                ids.add(json.loads(line)["id"])
+            except (ValueError, KeyError, TypeError):
+                continue   # blank or torn line, read_journal skips it too
+    return ids
+
+def columns_complete(segment, path=DELTA_FILE):
+    """True if segment's columns hold every set of the history outside workouts the delta adds.
+
+    False when the delta edits or removes archived workouts, or some entries kept
+    their sets inline (see _set_rows); readers of the columns then use the models.
+    """
+    return segment.inline_entries == 0 and not touched_ids(path) & segment.ids()
+
+def delta_size(path=DELTA_FILE):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
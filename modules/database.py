@@ -0,0 +1,392 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# Optional SQLite storage. The exercise and workout modules switch to it
+# once this file exists (see `python -m modules.database import`).
+DATABASE_FILE = Path("data/gymlog.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exercises (
+    id          TEXT PRIMARY KEY,
+    title       TEXT NOT NULL,
+    title_lower TEXT NOT NULL,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_exercises_title ON exercises(title_lower);
+
+CREATE TABLE IF NOT EXISTS tags (
+    exercise_id TEXT NOT NULL REFERENCES exercises(id) ON DELETE CASCADE,
+    position    INTEGER NOT NULL,
+    tag         TEXT NOT NULL,
+    tag_lower   TEXT NOT NULL,
+    PRIMARY KEY (exercise_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag_lower, exercise_id);
+
+CREATE TABLE IF NOT EXISTS workouts (
+    seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+    id           TEXT NOT NULL UNIQUE,
+    date         TEXT,
+    created_at   TEXT,
+    last_updated TEXT,
+    extra        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_workouts_date ON workouts(date);
+
+CREATE TABLE IF NOT EXISTS workout_exercises (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    workout_seq INTEGER NOT NULL REFERENCES workouts(seq) ON DELETE CASCADE,
+    position    INTEGER NOT NULL,
+    exercise_id TEXT NOT NULL,
+    title       TEXT,
+    extra       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_workout_exercises_exercise ON workout_exercises(exercise_id, workout_seq);
+CREATE INDEX IF NOT EXISTS idx_workout_exercises_workout ON workout_exercises(workout_seq, position);
+
+CREATE TABLE IF NOT EXISTS sets (
+    workout_exercise_seq INTEGER NOT NULL REFERENCES workout_exercises(seq) ON DELETE CASCADE,
+    position             INTEGER NOT NULL,
+    weight               REAL,
+    reps                 INTEGER,
+    PRIMARY KEY (workout_exercise_seq, position)
+);
+"""
+
+# Columns stored explicitly; any other keys are kept as JSON in `extra` so exports are lossless
+WORKOUT_KEYS = ("id", "date", "exercises", "created_at", "last_updated")
+WORKOUT_EXERCISE_KEYS = ("exercise_id", "sets", "title")
+
+_local = threading.local()
+# Bumped on every exercise write, so the search indexes built over load_exercises() know to rebuild
+_exercise_changes = 0
+
+
+def enabled():
+    return DATABASE_FILE.exists()
+
+def connect():
+    """Connection for the current thread, created (with the schema) on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DATABASE_FILE:
+        DATABASE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(DATABASE_FILE)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+        _local.path = DATABASE_FILE
+    return conn
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+def _extra(item, known_keys):
+    extra = {k: v for k, v in item.items() if k not in known_keys}
+    return json.dumps(extra, ensure_ascii=False) if extra else None
+
+def _with_extra(item, extra):
+    if extra:
+        item.update(json.loads(extra))
+    return item
+
+
+# ---------- EXERCISES ----------
+def _insert_exercise(conn, exercise):
+    conn.execute(
+        "INSERT INTO exercises (id, title, title_lower, data) VALUES (?, ?, ?, ?)",
+        (exercise["id"], exercise["title"], exercise["title"].lower(), json.dumps(exercise, ensure_ascii=False)),
+    )
+    _insert_tags(conn, exercise)
+
+def _insert_tags(conn, exercise):
+    conn.executemany(
+        "INSERT INTO tags (exercise_id, position, tag, tag_lower) VALUES (?, ?, ?, ?)",
+        [(exercise["id"], i, tag, tag.lower()) for i, tag in enumerate(exercise.get("tags", []))],
+    )
+
+def _get_exercise(conn, exercise_id):
+    row = conn.execute("SELECT data FROM exercises WHERE id = ?", (exercise_id,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def _exercises_changed():
+    global _exercise_changes
+    _exercise_changes += 1
+
+def exercises_version():
+    """Token that changes when exercises are written, here or (data_version) by another connection."""
+    return (_exercise_changes, connect().execute("PRAGMA data_version").fetchone()[0])
+
+def load_exercises():
+    rows = connect().execute("SELECT data FROM exercises ORDER BY rowid")
+    return [json.loads(data) for (data,) in rows]
+
+def save_exercises(exercises):
+    conn = connect()
+    with conn:
+        conn.execute("DELETE FROM exercises")
+        for exercise in exercises:
+            _insert_exercise(conn, exercise)
+    _exercises_changed()
+
+def add_exercise(new_exercise):
+    conn = connect()
+    with conn:
+        if _get_exercise(conn, new_exercise["id"]):
+            raise ValueError(f"Item with id '{new_exercise['id']}' already exists.")
+        now = _now()
+        new_exercise["created_at"] = now
+        new_exercise["last_updated"] = now
+        _insert_exercise(conn, new_exercise)
+    _exercises_changed()
+    return new_exercise
+
+def edit_exercise(exercise_id, updates):
+    conn = connect()
+    with conn:
+        exercise = _get_exercise(conn, exercise_id)
+        if exercise is None:
+            raise ValueError(f"No item found with id '{exercise_id}'")
+        exercise.update(updates)
+        exercise["last_updated"] = _now()
+        conn.execute("DELETE FROM tags WHERE exercise_id = ?", (exercise_id,))
+        conn.execute(
+            "UPDATE exercises SET id = ?, title = ?, title_lower = ?, data = ? WHERE id = ?",
+            (exercise["id"], exercise["title"], exercise["title"].lower(),
+             json.dumps(exercise, ensure_ascii=False), exercise_id),
+        )
+        _insert_tags(conn, exercise)
+    _exercises_changed()
+    return exercise_id
+
+def remove_exercise(exercise_id):
+    conn = connect()
+    with conn:
+        cur = conn.execute("DELETE FROM exercises WHERE id = ?", (exercise_id,))
+        if cur.rowcount == 0:
+            raise ValueError(f"No item found with id '{exercise_id}'")
+    _exercises_changed()
+    return exercise_id
+
+def get_all_tags():
+    rows = connect().execute("SELECT DISTINCT tag FROM tags ORDER BY tag")
+    return [tag for (tag,) in rows]
+
+def get_tag_counts():
+    rows = connect().execute("SELECT tag, COUNT(DISTINCT exercise_id) FROM tags GROUP BY tag ORDER BY tag")
+    return dict(rows)
+
+
+# ---------- WORKOUTS ----------
+def _insert_workout(conn, workout):
+    cur = conn.execute(
+        "INSERT INTO workouts (id, date, created_at, last_updated, extra) VALUES (?, ?, ?, ?, ?)",
+        (workout["id"], workout.get("date"), workout.get("created_at"), workout.get("last_updated"),
+         _extra(workout, WORKOUT_KEYS)),
+    )
+    _insert_workout_exercises(conn, cur.lastrowid, workout.get("exercises", []))
+
+def _insert_workout_exercises(conn, workout_seq, exercises):
+    for position, exercise in enumerate(exercises):
+        cur = conn.execute(
+            "INSERT INTO workout_exercises (workout_seq, position, exercise_id, title, extra) VALUES (?, ?, ?, ?, ?)",
+            (workout_seq, position, exercise["exercise_id"], exercise.get("title"),
+             _extra(exercise, WORKOUT_EXERCISE_KEYS)),
+        )
+        conn.executemany(
+            "INSERT INTO sets (workout_exercise_seq, position, weight, reps) VALUES (?, ?, ?, ?)",
+            [(cur.lastrowid, i, s.get("weight"), s.get("reps")) for i, s in enumerate(exercise.get("sets", []))],
+        )
+
+def _sets(conn, workout_exercise_seq):
+    rows = conn.execute(
+        "SELECT weight, reps FROM sets WHERE workout_exercise_seq = ? ORDER BY position",
+        (workout_exercise_seq,),
+    )
+    return [{"weight": weight, "reps": reps} for weight, reps in rows]
+
+def _workout_exercise(exercise_id, title, extra, sets):
+    return _with_extra({"exercise_id": exercise_id, "sets": sets, "title": title}, extra)
+
+def _workout(workout_id, date, created_at, last_updated, extra, exercises):
+    return _with_extra({
+        "id": workout_id,
+        "date": date,
+        "exercises": exercises,
+        "created_at": created_at,
+        "last_updated": last_updated,
+    }, extra)
+
+WORKOUT_COLUMNS = "seq, id, date, created_at, last_updated, extra"
+
+def _build_workout(conn, seq, *columns):
+    exercises = [
+        _workout_exercise(exercise_id, title, extra, _sets(conn, we_seq))
+        for we_seq, exercise_id, title, extra in conn.execute(
+            "SELECT seq, exercise_id, title, extra FROM workout_exercises WHERE workout_seq = ? ORDER BY position",
+            (seq,),
+        )
+    ]
+    return _workout(*columns, exercises)
+
+def load_workouts():
+    # Three ordered scans stitched together, instead of one query per workout
+    conn = connect()
+    sets = {}
+    for we_seq, weight, reps in conn.execute(
+        "SELECT workout_exercise_seq, weight, reps FROM sets ORDER BY workout_exercise_seq, position"
+    ):
+        sets.setdefault(we_seq, []).append({"weight": weight, "reps": reps})
+
+    exercises = {}
+    for we_seq, workout_seq, exercise_id, title, extra in conn.execute(
+        "SELECT seq, workout_seq, exercise_id, title, extra FROM workout_exercises ORDER BY workout_seq, position"
+    ):
+        exercises.setdefault(workout_seq, []).append(
+            _workout_exercise(exercise_id, title, extra, sets.get(we_seq, []))
+        )
+
+    return [
+        _workout(*columns, exercises.get(seq, []))
+        for seq, *columns in conn.execute(f"SELECT {WORKOUT_COLUMNS} FROM workouts ORDER BY seq")
+    ]
+
+def save_workouts(workouts):
+    conn = connect()
+    with conn:
+        conn.execute("DELETE FROM workouts")
+        for workout in workouts:
+            _insert_workout(conn, workout)
+
+def add_workout(new_workout):
+    conn = connect()
+    with conn:
+        if conn.execute("SELECT 1 FROM workouts WHERE id = ?", (new_workout["id"],)).fetchone():
+            raise ValueError(f"Item with id '{new_workout['id']}' already exists.")
+        now = _now()
+        new_workout["created_at"] = now
+        new_workout["last_updated"] = now
+        _insert_workout(conn, new_workout)
+    return new_workout
+
+def add_workouts(new_workouts):
+    """Insert several workouts in one transaction; nothing is added if any id is taken."""
+    conn = connect()
+    with conn:
+        now = _now()
+        for new_workout in new_workouts:
+            # also sees the rows inserted just before, so repeats within the batch are caught
+            if conn.execute("SELECT 1 FROM workouts WHERE id = ?", (new_workout["id"],)).fetchone():
+                raise ValueError(f"Item with id '{new_workout['id']}' already exists.")
+            new_workout["created_at"] = now
+            new_workout["last_updated"] = now
+            _insert_workout(conn, new_workout)
+    return new_workouts
+
+def edit_workout(workout_id, updates):
+    conn = connect()
+    with conn:
+        row = conn.execute(
+            f"SELECT {WORKOUT_COLUMNS} FROM workouts WHERE id = ?", (workout_id,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"No item found with id '{workout_id}'")
+        workout = _build_workout(conn, *row)
+        workout.update(updates)
+        workout["last_updated"] = _now()
+        # rewrite the rows under the same seq so history order is kept
+        conn.execute("DELETE FROM workout_exercises WHERE workout_seq = ?", (row[0],))
+        conn.execute(
+            "UPDATE workouts SET id = ?, date = ?, created_at = ?, last_updated = ?, extra = ? WHERE seq = ?",
+            (workout["id"], workout.get("date"), workout.get("created_at"), workout["last_updated"],
+             _extra(workout, WORKOUT_KEYS), row[0]),
+        )
+        _insert_workout_exercises(conn, row[0], workout.get("exercises", []))
+    return workout_id
+
+def remove_workout(workout_id):
+    conn = connect()
+    with conn:
+        cur = conn.execute("DELETE FROM workouts WHERE id = ?", (workout_id,))
+        if cur.rowcount == 0:
+            raise ValueError(f"No item found with id '{workout_id}'")
+    return workout_id
+
+def get_previous_sets(exercise_id):
+    conn = connect()
+    row = conn.execute(
+        """SELECT seq FROM workout_exercises WHERE exercise_id = ?
+           ORDER BY workout_seq DESC, position ASC LIMIT 1""",
+        (exercise_id,),
+    ).fetchone()
+    return _sets(conn, row[0]) if row else []
+
+def get_logged_exercises():
+    rows = connect().execute(
+        """SELECT exercise_id, title FROM workout_exercises
+           WHERE seq IN (SELECT MAX(seq) FROM workout_exercises GROUP BY exercise_id)"""
+    )
+    return dict(rows)
+
+def get_exercise_sessions(exercise_id):
+    """(workout id, mean weight, top weight, volume, reps) per logged entry of exercise_id with sets, in history order.
+
+    Only that exercise's rows are read, through idx_workout_exercises_exercise.
+    """
+    rows = connect().execute(
+        """SELECT w.id, AVG(s.weight), MAX(s.weight), SUM(s.weight * s.reps), SUM(s.reps)
+           FROM workout_exercises we
+           JOIN workouts w ON w.seq = we.workout_seq
+           JOIN sets s ON s.workout_exercise_seq = we.seq
+           WHERE we.exercise_id = ?
+           GROUP BY we.seq
+           ORDER BY we.workout_seq, we.position""",
+        (exercise_id,),
+    )
+    return rows.fetchall()
+
+
+# ---------- IMPORT / EXPORT ----------
+def import_json(exercises, workouts):
+    """Replace the database contents with exercise and workout lists in the JSON schema."""
+    save_exercises(exercises)
+    save_workouts(workouts)
+    return len(exercises), len(workouts)
+
+def export_json():
+    """Return (exercises, workouts) in the JSON schema."""
+    return load_exercises(), load_workouts()
+
+
+if __name__ == "__main__":
+    import argparse
+    from utils.json_handler import load_json, save_json
+    from utils.journal import read_journal
+    from modules.exercises import EXERCISE_FILE
+    from modules import archive
+    from modules.models import workouts_to_json
+    from modules.workout import WORKOUT_ARCHIVE, WORKOUT_FILE, WORKOUT_JOURNAL
+
+    parser = argparse.ArgumentParser(description="SQLite storage for exercises and workouts")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--exercises", type=Path, default=EXERCISE_FILE)
+    parser.add_argument("--workouts", type=Path, default=None)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        if args.workouts is None and archive.exists():
+            workouts = workouts_to_json(read_journal(archive.DELTA_FILE, base=archive.current().workouts()))
+        else:
+            source = args.workouts or next(
+                (p for p in (WORKOUT_JOURNAL, WORKOUT_ARCHIVE) if p.exists()), WORKOUT_FILE)
+            workouts = read_journal(source) if source.suffix == ".jsonl" else load_json(source)
+        counts = import_json(load_json(args.exercises), workouts)
+        print(f"Imported {counts[0]} exercises and {counts[1]} workouts into {DATABASE_FILE}")
+    else:
+        exercises, workouts = export_json()
+        save_json(args.exercises, exercises)
+        save_json(args.workouts or WORKOUT_FILE, workouts)
+        print(f"Exported {len(exercises)} exercises and {len(workouts)} workouts from {DATABASE_FILE}")
@@ -1,66 +1,170 @@
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from utils.json_handler import load_json, save_json
-from utils.helpers import add, edit, remove
+from utils.instrument import timed
+from utils.json_handler import restore_backup, save_json
+from utils.repository import generation, load_cached, store
+from utils.helpers import Batch, add, edit, remove
+from utils.search_index import SearchIndex, TagIndex
+from modules import database
 
 EXERCISE_FILE = Path("data/exercises.json")
+# Seconds to wait before writing, so a burst of edits becomes one save
+SAVE_DELAY = 0.5
 
+# {"version": _index_version() they were built for,
+#  "search": SearchIndex over title/tags/description, "tags": TagIndex}
+# Built over the JSON file or the database alike, so both search the same way.
+_indexes = None
+
+@timed()
 def load_exercises():
-    if not EXERCISE_FILE.exists():
+    if database.enabled():
+        return database.load_exercises()
+    if not restore_backup(EXERCISE_FILE):
         EXERCISE_FILE.parent.mkdir(parents=True, exist_ok=True)
         save_json(EXERCISE_FILE, [])
         return []
-    return load_json(EXERCISE_FILE) or []
+    return load_cached(EXERCISE_FILE) or []
 
+@timed()
 def save_exercises(exercises):
-    save_json(EXERCISE_FILE, exercises)
+    if database.enabled():
+        return database.save_exercises(exercises)
+    store(EXERCISE_FILE, exercises, saver=lambda path, data: save_json(path, data, delay=SAVE_DELAY))
 
+@timed()
 def add_exercise(new_exercise):
+    if database.enabled():
+        return database.add_exercise(new_exercise)
     exercises = load_exercises()
     updated, added = add(exercises, new_exercise)
     save_exercises(updated)
+    if _indexes_current():
+        _indexes["search"].add(added["id"], added)
+        _indexes["tags"].add(added["id"], added.get("tags", []))
     return added
 
+@timed()
 def edit_exercise(exercise_id, updates):
+    if database.enabled():
+        return database.edit_exercise(exercise_id, updates)
     exercises = load_exercises()
     updated, _ = edit(exercises, exercise_id, updates)
     save_exercises(updated)
+    if _indexes_current():
+        edited = next(ex for ex in updated if ex["id"] == exercise_id)
+        _indexes["search"].update(exercise_id, edited)
+        _indexes["tags"].update(exercise_id, edited.get("tags", []))
     return exercise_id
 
+@timed()
 def remove_exercise(exercise_id):
+    if database.enabled():
+        return database.remove_exercise(exercise_id)
     exercises = load_exercises()
     updated, _ = remove(exercises, exercise_id)
     save_exercises(updated)
+    if _indexes_current():
+        _indexes["search"].remove(exercise_id)
+        _indexes["tags"].remove(exercise_id)
     return exercise_id
 
-
+@contextmanager
+def batch():
+    """Make many changes in memory and save them once when the block ends.
+
+        with exercises.batch() as changes:
+            changes.add(normalize_exercise_data(data))
+            changes.edit(exercise_id, updates)
+            changes.remove(other_id)
+
+    Lookups by id are dict lookups (see helpers.Batch). If the block raises,
+    nothing is saved and the loaded exercises are left as they were.
+    """
+    if database.enabled():
+        changes = Batch(database.load_exercises())
+        yield changes
+        if changes.changed():
+            database.save_exercises(changes.result())
+        return
+
+    changes = Batch(load_exercises())
+    yield changes
+    if not changes.changed():
+        return
+    current = _indexes_current()
+    save_exercises(changes.result())
+    if current:
+        for exercise_id in changes.removed:
+            _indexes["search"].remove(exercise_id)
+            _indexes["tags"].remove(exercise_id)
+        for exercise_id in changes.edited:
+            edited = changes.get(exercise_id)
+            _indexes["search"].update(exercise_id, edited)
+            _indexes["tags"].update(exercise_id, edited.get("tags", []))
+        for exercise_id, added in changes.added.items():
+            _indexes["search"].add(exercise_id, added)
+            _indexes["tags"].add(exercise_id, added.get("tags", []))
+
+
+def _index_version():
+    if database.enabled():
+        return ("db", database.exercises_version())
+    load_exercises()  # re-parses only if the file changed on disk
+    return generation(EXERCISE_FILE)
+
+def _indexes_current():
+    return _indexes is not None and _indexes["version"] == _index_version()
+
+def _get_indexes():
+    """Search and tag indexes, rebuilt only when the exercises were reloaded or (database) written."""
+    global _indexes
+    version = _index_version()
+    if _indexes is None or _indexes["version"] != version:
+        exercises = load_exercises()
+        search = SearchIndex(
+            texts=lambda ex: [ex.get("title", ""), *ex.get("tags", []), ex.get("description", "")],
+            sort_key=lambda ex: ex.get("title", "").lower(),
+            prefix_texts=lambda ex: [ex.get("title", "")],
+        )
+        tags = TagIndex()
+        for ex in exercises:
+            search.add(ex["id"], ex)
+            tags.add(ex["id"], ex.get("tags", []))
+        _indexes = {"version": version, "search": search, "tags": tags}
+    return _indexes
+
+@timed()
 def get_all_tags():
     """Return a sorted list of all unique tags from exercises."""
-    exercises = search_exercises(None)
-    tags = set()
-    for ex in exercises:
-        tags.update(ex.get("tags", []))
-    return sorted(tags)
-
-def search_exercises(query=None, sort_alpha=True):
-    """Returns list of exercises matching query. If querry=None, returns the whole list."""
-    exercises = load_exercises()
-    if not exercises:
-        return []
-
-    if not query:
-        filtered = exercises
-    else:
-        q = query.lower()
-        filtered = [
-            ex for ex in exercises
-            if q in ex["title"].lower() or any(q in t.lower() for t in ex.get("tags", []))
-        ]
-
-    if sort_alpha:
-        filtered.sort(key=lambda x: x.get("title", "").lower())
-
-    return filtered
+    if database.enabled():
+        return database.get_all_tags()
+    return _get_indexes()["tags"].tags()
+
+@timed()
+def get_tag_counts():
+    """Return {tag: number of exercises with it}, sorted by tag."""
+    if database.enabled():
+        return database.get_tag_counts()
+    return _get_indexes()["tags"].counts()
+
+@timed()
+def search_exercises(query=None, sort_alpha=True, fuzzy=True, all_tags=(), any_tags=(), no_tags=()):
+    """Returns list of exercises matching query. If querry=None, returns the whole list.
+
+    Matches title, tags or description; with fuzzy, close typos follow the exact matches when those are few.
+    all_tags/any_tags/no_tags narrow the results to exercises with every / at least one / none of those tags.
+    """
+    indexes = _get_indexes()
+    allowed = indexes["tags"].filter(all_tags, any_tags, no_tags)
+    results = indexes["search"].search(query, fuzzy=fuzzy, within=allowed)
+
+    if not sort_alpha:
+        order = {ex["id"]: i for i, ex in enumerate(load_exercises())}
+        results.sort(key=lambda x: order[x["id"]])
+
+    return results
 
 
 def exercise_build_metric(data, key, default_unit=None):
@@ -0,0 +1,167 @@
+import csv
+import json
+from pathlib import Path
+
+import numpy as np
+from utils.journal import read_journal
+from utils.json_handler import save_json
+from modules import archive, database
+from modules.exercises import load_exercises
+from modules.models import SetColumns
+from modules.workout import load_workout
+
+# Streaming export of the history as one row per set. Every stage is a generator
+# of column chunks ({column: array} of at most CHUNK_ROWS rows), so memory stays
+# bounded by the chunk size whatever the history size:
+#
+#   set_chunks() -> filter_chunks(...) -> write_csv / write_jsonl / write_chunks
+#
+# With the columnar archive the rows are read straight from its memory-mapped
+# files, without building the workout models at all.
+COLUMNS = ("date", "exercise_id", "set", "weight", "reps", "volume")
+CHUNK_ROWS = 50_000
+FORMATS = ("csv", "jsonl", "chunks")
+
+
+def _chunk(dates, exercise_ids, set_index, weights, reps):
+    weight = np.asarray(weights, dtype=np.float64)
+    reps = np.asarray(reps, dtype=np.int64)
+    return {
+        "date": np.asarray(dates, dtype="datetime64[D]"),
+        "exercise_id": np.asarray(exercise_ids, dtype=object),
+        "set": np.asarray(set_index, dtype=np.int64),
+        "weight": weight,
+        "reps": reps,
+        "volume": weight * reps,
+    }
+
+def _workout_chunks(workouts, chunk_rows):
+    # rows gathered from workout models/dicts, flushed every chunk_rows sets
+    rows = ([], [], [], [], [])
+    for workout in workouts:
+        try:
+            day = np.datetime64(workout["id"], "D")
+        except (KeyError, ValueError):
+            day = np.datetime64("NaT", "D")
+        for exercise in workout.get("exercises", []):
+            sets = exercise.get("sets", [])
+            if isinstance(sets, SetColumns):
+                weights, reps = sets.weights, sets.reps
+            else:
+                weights, reps = [s["weight"] for s in sets], [s["reps"] for s in sets]
+            n = len(reps)
+            rows[0].extend([day] * n)
+            rows[1].extend([exercise["exercise_id"]] * n)
+            rows[2].extend(range(1, n + 1))
+            rows[3].extend(weights)
+            rows[4].extend(reps)
+        if len(rows[0]) >= chunk_rows:
+            yield _chunk(*rows)
+            rows = ([], [], [], [], [])
+    if rows[0]:
+        yield _chunk(*rows)
+
+def _archive_chunks(segment, chunk_rows):
+    # straight from the mapped columns, chunk_rows at a time
+    entry = segment.column("entry")
+    exercise_ids = np.array(segment.exercise_ids, dtype=object)
+    total = entry.size
+    for lo in range(0, total, chunk_rows):
+        hi = min(lo + chunk_rows, total)
+        entries = np.asarray(entry[lo:hi])
+        # first row of each entry in the chunk; an entry may have started in the previous chunk
+        first = np.searchsorted(entry, entries, side="left")
+        yield _chunk(
+            segment.column("timestamp")[lo:hi],
+            exercise_ids[np.asarray(segment.column("exercise")[lo:hi])],
+            np.arange(lo, hi) - first + 1,
+            segment.column("weight")[lo:hi],
+            segment.column("reps")[lo:hi],
+        )
+
+def set_chunks(chunk_rows=CHUNK_ROWS):
+    """The whole history as column chunks (see COLUMNS), in history order; set counts from 1."""
+    if not database.enabled() and archive.exists():
+        segment = archive.current()
+        if archive.columns_complete(segment):
+            yield from _archive_chunks(segment, chunk_rows)
+            # the delta only adds workouts here
+            yield from _workout_chunks(read_journal(archive.DELTA_FILE), chunk_rows)
+            return
+    yield from _workout_chunks(load_workout(), chunk_rows)
+
+
+# ---------- FILTERS ----------
+def filter_chunks(chunks, exercise_ids=None, tags=None, start=None, end=None):
+    """Keep rows of the given exercises, of exercises with any of the tags, dated start..end (inclusive)."""
+    wanted = set(exercise_ids or ())
+    if tags:
+        tags = {t.lower() for t in tags}
+        wanted |= {ex["id"] for ex in load_exercises() if tags & {t.lower() for t in ex.get("tags", [])}}
+    wanted = np.array(sorted(wanted), dtype=object) if exercise_ids or tags else None
+    low = np.datetime64(start, "D") if start else None
+    high = np.datetime64(end, "D") if end else None
+
+    for chunk in chunks:
+        keep = np.ones(chunk["date"].size, dtype=bool)
+        if wanted is not None:
+            keep &= np.isin(chunk["exercise_id"], wanted)
+        if low is not None:
+            keep &= chunk["date"] >= low
+        if high is not None:
+            keep &= chunk["date"] <= high
+        if keep.all():
+            yield chunk
+        elif keep.any():
+            yield {name: column[keep] for name, column in chunk.items()}
+
+def _rows(chunk):
+    # (date, exercise_id, set, weight, reps, volume) tuples of plain Python values
+    return zip(chunk["date"].astype(str).tolist(), *(chunk[name].tolist() for name in COLUMNS[1:]))
+
+def rows(chunks):
+    """Row tuples (in COLUMNS order) of every chunk."""
+    for chunk in chunks:
+        yield from _rows(chunk)
+
+
+# ---------- WRITERS ----------
+def write_csv(path, chunks):
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for chunk in chunks:
+            writer.writerows(_rows(chunk))
+            count += chunk["date"].size
+    return count
+
+def write_jsonl(path, chunks):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.writelines(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n" for row in _rows(chunk))
+            count += chunk["date"].size
+    return count
+
+def write_chunks(directory, chunks):
+    """Columnar output: one .npz per chunk (row group) plus manifest.json listing them."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    parts = []
+    for i, chunk in enumerate(chunks):
+        name = f"part-{i:05d}.npz"
+        # exercise ids as a fixed-width string column, so the files load without pickle
+        np.savez_compressed(directory / name, **dict(chunk, exercise_id=chunk["exercise_id"].astype(str)))
+        parts.append({"file": name, "rows": int(chunk["date"].size)})
+    save_json(directory / "manifest.json", {"columns": list(COLUMNS), "parts": parts})
+    return sum(part["rows"] for part in parts)
+
+def export_sets(path, fmt=None, exercise_ids=None, tags=None, start=None, end=None, chunk_rows=CHUNK_ROWS):
+    """Stream the filtered set rows to path as csv, jsonl or chunks (a directory); returns the row count."""
+    fmt = fmt or {".csv": "csv", ".jsonl": "jsonl"}.get(Path(path).suffix.lower(), "chunks")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, use one of: {', '.join(FORMATS)}")
+    chunks = filter_chunks(set_chunks(chunk_rows), exercise_ids, tags, start, end)
+    writer = {"csv": write_csv, "jsonl": write_jsonl, "chunks": write_chunks}[fmt]
+    return writer(path, chunks)
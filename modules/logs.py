@@ -0,0 +1,187 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+
+from modules.workout import add_workout_listener, history_version, load_workout
+
+# Query layer over the workout history for the Logs tab: indexes by date, by
+# exercise and by ISO week, so its questions are answered with binary searches
+# and dict lookups instead of walks over every workout.
+# Workouts are keyed by their id, an ISO timestamp, which sorts chronologically
+# as a string. Workouts whose id isn't a timestamp aren't indexed.
+
+PAGE_SIZE = 25
+
+
+def _day_key(day):
+    # the smallest id on that day
+    return day.isoformat()
+
+def _next_day_key(day):
+    return (day + timedelta(days=1)).isoformat()
+
+
+class WorkoutIndex:
+    """Sorted and grouped workout ids over a history list, plus exercise titles."""
+
+    def __init__(self, workouts=()):
+        self.workouts = {}       # id -> workout
+        self.keys = []           # every indexed id, sorted
+        self.by_exercise = {}    # exercise_id -> sorted ids of workouts logging it
+        self.by_week = {}        # (ISO year, ISO week) -> sorted ids
+        self.titles = {}         # exercise_id -> title, the latest one logged
+        self._summaries = {}     # id -> summary(), filled in as pages are shown
+        for workout in workouts:
+            self.add(workout, sort=False)
+        self.keys.sort()
+        for ids in (*self.by_exercise.values(), *self.by_week.values()):
+            ids.sort()
+
+    def add(self, workout, sort=True):
+        for exercise in workout.get("exercises", []):
+            self.titles[exercise["exercise_id"]] = exercise.get("title", exercise["exercise_id"])
+        try:
+            key = workout["id"]
+            week = datetime.fromisoformat(key).isocalendar()[:2]
+        except (KeyError, TypeError, ValueError):
+            return
+        # append when building (sorted once at the end), keep order when adding one
+        put = insort if sort else list.append
+        self.workouts[key] = workout
+        put(self.keys, key)
+        put(self.by_week.setdefault(week, []), key)
+        for exercise_id in {e["exercise_id"] for e in workout.get("exercises", [])}:
+            put(self.by_exercise.setdefault(exercise_id, []), key)
+
+    def _range(self, keys, start=None, end=None):
+        # ids of keys dated start..end (inclusive dates)
+        lo = 0 if start is None else bisect_left(keys, _day_key(start))
+        hi = len(keys) if end is None else bisect_left(keys, _next_day_key(end))
+        return keys[lo:hi]
+
+    def between(self, start=None, end=None):
+        return [self.workouts[key] for key in self._range(self.keys, start, end)]
+
+    def week(self, day):
+        return [self.workouts[key] for key in self.by_week.get(day.isocalendar()[:2], [])]
+
+    def sessions(self, exercise_id, start=None, end=None):
+        return [self.workouts[key] for key in self._range(self.by_exercise.get(exercise_id, []), start, end)]
+
+    def page(self, cursor=None, limit=PAGE_SIZE, newest_first=True):
+        """(workouts, next cursor) after cursor, the id the previous page ended on; next cursor is None at the end."""
+        keys = self.keys
+        if newest_first:
+            hi = len(keys) if cursor is None else bisect_left(keys, cursor)
+            lo = max(0, hi - limit)
+            chosen = keys[lo:hi][::-1]
+            more = lo > 0
+        else:
+            lo = 0 if cursor is None else bisect_right(keys, cursor)
+            chosen = keys[lo:lo + limit]
+            more = lo + limit < len(keys)
+        return [self.workouts[key] for key in chosen], (chosen[-1] if chosen and more else None)
+
+    def summary(self, key):
+        """Cached summary row of one workout (see _summarize)."""
+        row = self._summaries.get(key)
+        if row is None:
+            row = self._summaries[key] = _summarize(self.workouts[key])
+        return row
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def _minutes(start, end):
+    try:
+        return round((datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds() / 60)
+    except (TypeError, ValueError):
+        return None
+
+def _summarize(workout):
+    # {"id", "date", "exercises", "sets", "volume", "duration"}; duration in minutes from
+    # started_at to created_at (saved), None for workouts logged without a start time
+    sets = 0
+    volume = 0.0
+    for exercise in workout.get("exercises", []):
+        for s in exercise.get("sets", []):
+            sets += 1
+            volume += s["weight"] * s["reps"]
+    return {
+        "id": workout["id"],
+        "date": workout.get("date", workout["id"][:10]),
+        "exercises": len(workout.get("exercises", [])),
+        "sets": sets,
+        "volume": volume,
+        "duration": _minutes(workout.get("started_at"), workout.get("created_at")),
+    }
+
+
+# {"version": history_version() it was built for, "index": WorkoutIndex}
+_store = None
+
+
+def rebuild():
+    global _store
+    _store = {"version": history_version(), "index": WorkoutIndex(load_workout())}
+    return _store["index"]
+
+def get_index():
+    """Shared WorkoutIndex, rebuilt only when the history was edited or reloaded."""
+    if _store is None or _store["version"] != history_version():
+        return rebuild()
+    return _store["index"]
+
+
+# ---------- QUERIES ----------
+def workouts_between(start=None, end=None):
+    """Workouts dated start..end (dates, inclusive; None is open-ended), oldest first."""
+    return get_index().between(start, end)
+
+def workouts_this_week(today=None):
+    """Workouts in the ISO week (Monday to Sunday) of today."""
+    return get_index().week(today or date.today())
+
+def exercise_sessions(exercise_id, weeks=None, today=None):
+    """Workouts logging exercise_id, oldest first; with weeks, only the last that many weeks (this one included) up to today."""
+    if weeks is None:
+        return get_index().sessions(exercise_id)
+    today = today or date.today()
+    return get_index().sessions(exercise_id, today - timedelta(days=today.weekday(), weeks=weeks - 1), today)
+
+def page(cursor=None, limit=PAGE_SIZE, newest_first=True):
+    """One page of past workouts and the cursor for the next page (None after the last).
+
+        workouts, cursor = logs.page()
+        more, cursor = logs.page(cursor)
+    """
+    return get_index().page(cursor, limit, newest_first)
+
+def page_summaries(cursor=None, limit=PAGE_SIZE):
+    """page() of past workouts, newest first, as cached summary rows instead of workouts."""
+    index = get_index()
+    workouts, cursor = index.page(cursor, limit)
+    return [index.summary(w["id"]) for w in workouts], cursor
+
+def workout_details(workout_id):
+    """(title, sets text, volume) per exercise of one workout, e.g. ("Squat", "60x8, 60x8, 65x6", 1350.0)."""
+    workout = get_index().workouts.get(workout_id)
+    if workout is None:
+        return []
+    details = []
+    for exercise in workout.get("exercises", []):
+        sets = exercise.get("sets", [])
+        text = ", ".join(f"{s['weight']:g}x{s['reps']}" for s in sets)
+        details.append((exercise.get("title", exercise["exercise_id"]), text, sum(s["weight"] * s["reps"] for s in sets)))
+    return details
+
+def logged_exercises():
+    """Map of exercise_id -> title for every exercise that appears in a workout."""
+    return dict(get_index().titles)
+
+def _on_workout_added(workout):
+    if _store is not None and _store["version"] == history_version():
+        _store["index"].add(workout)
+
+
+add_workout_listener(_on_workout_added)
@@ -0,0 +1,231 @@
+import sys
+from array import array
+from collections.abc import MutableMapping, Sequence
+from dataclasses import dataclass
+
+# Compact in-memory forms of the JSON records.
+# Every model is also a mapping with the JSON keys (workout["exercises"],
+# s["weight"], workout.get("date"), ...), so code written against the plain
+# dicts keeps working. to_json() / from_json() convert losslessly: keys that
+# are absent stay absent, unknown keys are kept in `extra`, and sets that
+# can't be packed exactly stay a plain list of dicts.
+
+_MISSING = object()   # the key is absent from the JSON object (not the same as null)
+
+MAX_REPS = 0xFFFF     # array('H')
+
+
+class _Record(MutableMapping):
+    """Mapping view over a slotted record. Subclasses list their JSON keys in KEYS."""
+
+    __slots__ = ()
+    KEYS = ()
+
+    @classmethod
+    def _convert(cls, key, value):
+        # compact form of a value assigned to a known key
+        return value
+
+    @staticmethod
+    def _json(value):
+        return value
+
+    @classmethod
+    def from_json(cls, data):
+        record = cls()
+        for key, value in data.items():
+            if key in cls.KEYS:
+                setattr(record, key, cls._convert(key, value))
+            elif record.extra is None:
+                record.extra = {key: value}
+            else:
+                record.extra[key] = value
+        return record
+
+    def to_json(self):
+        # hot when saving the whole history, so no going through the Mapping methods
+        data = {}
+        for key in self.KEYS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                data[key] = self._json(value)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getitem__(self, key):
+        if key in self.KEYS:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self.KEYS:
+            setattr(self, key, self._convert(key, value))
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.KEYS:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+        else:
+            if self.extra is None:
+                raise KeyError(key)
+            del self.extra[key]
+            if not self.extra:
+                self.extra = None
+
+    def __iter__(self):
+        for key in self.KEYS:
+            if getattr(self, key) is not _MISSING:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+@dataclass(slots=True, eq=False, repr=False)
+class SetRecord(_Record):
+    """One set, as handed out by SetColumns."""
+
+    KEYS = ("weight", "reps")
+
+    weight: float = _MISSING
+    reps: int = _MISSING
+    extra: dict = None
+
+
+class SetColumns(Sequence):
+    """A session's sets as two packed columns, weights array('f' or 'd') and reps array('H').
+
+    The columns can also be numpy views, e.g. on the memory-mapped archive (modules/archive.py).
+
+    Indexing gives SetRecord objects; weights/reps can go straight into numpy.
+    """
+
+    __slots__ = ("weights", "reps")
+
+    def __init__(self, weights, reps):
+        self.weights = weights
+        self.reps = reps
+
+    @classmethod
+    def pack(cls, sets):
+        """SetColumns for a list of {"weight": float, "reps": int} dicts, or None if it can't be packed exactly."""
+        if not isinstance(sets, list):
+            return None
+        # type checks through map() instead of a Python-level loop: this runs for every session on load
+        if set(map(type, sets)) != {dict} or set(map(len, sets)) != {2}:
+            return None
+        try:
+            weights = [s["weight"] for s in sets]
+            reps = [s["reps"] for s in sets]
+        except KeyError:
+            return None
+        if set(map(type, weights)) != {float} or set(map(type, reps)) != {int}:
+            return None
+        if not 0 <= min(reps) <= max(reps) <= MAX_REPS:
+            return None
+        packed = array("f", weights)
+        if packed.tolist() != weights:
+            # not representable in 32 bits (e.g. 62.3), keep full precision
+            packed = array("d", weights)
+        return cls(packed, array("H", reps))
+
+    def __len__(self):
+        return len(self.reps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        # float()/int(): the columns may be numpy arrays (memory-mapped archive), keep numpy scalars out
+        return SetRecord(float(self.weights[index]), int(self.reps[index]))
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def to_json(self):
+        return [{"weight": w, "reps": r} for w, r in zip(self.weights.tolist(), self.reps.tolist())]
+
+    def __repr__(self):
+        return f"SetColumns({self.to_json()!r})"
+
+
+@dataclass(slots=True, eq=False, repr=False)
+class ExerciseEntry(_Record):
+    """One exercise within a workout."""
+
+    KEYS = ("exercise_id", "title", "sets")
+
+    exercise_id: str = _MISSING
+    title: str = _MISSING
+    sets: object = _MISSING      # SetColumns, or the original list if it couldn't be packed
+    extra: dict = None
+
+    @classmethod
+    def _convert(cls, key, value):
+        if key == "sets":
+            return SetColumns.pack(value) or value
+        if type(value) is str:
+            # ids and titles repeat in every session of an exercise, share one copy
+            return sys.intern(value)
+        return value
+
+    @staticmethod
+    def _json(value):
+        return value.to_json() if isinstance(value, SetColumns) else value
+
+
+@dataclass(slots=True, eq=False, repr=False)
+class Workout(_Record):
+    """One logged workout."""
+
+    KEYS = ("id", "date", "exercises", "created_at", "last_updated")
+
+    id: str = _MISSING
+    date: str = _MISSING
+    exercises: list = _MISSING
+    created_at: str = _MISSING
+    last_updated: str = _MISSING
+    extra: dict = None
+
+    @classmethod
+    def _convert(cls, key, value):
+        if key == "exercises" and isinstance(value, list):
+            return [ExerciseEntry.from_json(e) if type(e) is dict else e for e in value]
+        return value
+
+    @staticmethod
+    def _json(value):
+        if isinstance(value, list):
+            return [e.to_json() if isinstance(e, _Record) else e for e in value]
+        return value
+
+
+# ---------- CONVERTERS ----------
+def workouts_from_json(items):
+    """Workout models for a list of workout dicts (anything else in the list is kept as is)."""
+    return [Workout.from_json(item) if type(item) is dict else item for item in items]
+
+def workouts_to_json(items):
+    """Plain JSON-ready dicts for a list of workouts, models or dicts."""
+    return [item.to_json() if isinstance(item, _Record) else item for item in items]
+
+def to_json(value):
+    """JSON-ready form of a model, SetColumns or anything already plain."""
+    return value.to_json() if isinstance(value, (_Record, SetColumns)) else value
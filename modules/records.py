@@ -0,0 +1,122 @@
+from pathlib import Path
+from utils.json_handler import load_json, save_json
+from utils.repository import file_stamp
+from modules import database
+from modules.stats import estimated_1rm
+from modules.workout import add_workout_listener, history_file, history_version, load_workout
+
+# Current personal records per exercise_id, so PR checks never rescan the history
+RECORDS_FILE = Path("data/records.json")
+
+# {"version": history_version(), "best": {exercise_id: record}}
+# record = {"max_weight": {"value", "workout_id"}, "best_1rm": {...}, "best_volume": {...},
+#           "reps_at_weight": {"<weight>": {"value", "workout_id"}}}
+_records = None
+
+
+def _weight_key(weight):
+    return f"{float(weight):g}"
+
+def _session_values(exercise_sets):
+    """Best values reached by one workout's sets of an exercise."""
+    reps_at_weight = {}
+    for s in exercise_sets:
+        key = _weight_key(s["weight"])
+        reps_at_weight[key] = max(reps_at_weight.get(key, 0), s["reps"])
+    return {
+        "max_weight": max(s["weight"] for s in exercise_sets),
+        "best_1rm": max(float(estimated_1rm(s["weight"], s["reps"])) for s in exercise_sets),
+        "best_volume": sum(s["weight"] * s["reps"] for s in exercise_sets),
+        "reps_at_weight": reps_at_weight,
+    }
+
+def _group_sets(workout):
+    # an exercise can appear more than once in a workout, its session is all of those sets
+    grouped = {}
+    for exercise in workout.get("exercises", []):
+        grouped.setdefault(exercise["exercise_id"], []).extend(exercise.get("sets", []))
+    return {ex_id: sets for ex_id, sets in grouped.items() if sets}
+
+def _compare(best, workout):
+    """New PRs in workout against best, as a list of dicts. Doesn't modify best."""
+    found = []
+    for ex_id, sets in _group_sets(workout).items():
+        current = best.get(ex_id)
+        values = _session_values(sets)
+        for kind in ("max_weight", "best_1rm", "best_volume"):
+            previous = current[kind]["value"] if current else None
+            if previous is None or values[kind] > previous:
+                found.append({"exercise_id": ex_id, "kind": kind, "value": values[kind], "previous": previous})
+        for weight, reps in values["reps_at_weight"].items():
+            previous = current["reps_at_weight"].get(weight, {}).get("value") if current else None
+            if previous is None or reps > previous:
+                found.append({"exercise_id": ex_id, "kind": "reps_at_weight", "weight": float(weight),
+                              "value": reps, "previous": previous})
+    return found
+
+def _apply(best, workout, found):
+    for pr in found:
+        record = best.setdefault(pr["exercise_id"], {"reps_at_weight": {}})
+        entry = {"value": pr["value"], "workout_id": workout["id"]}
+        if pr["kind"] == "reps_at_weight":
+            record["reps_at_weight"][_weight_key(pr["weight"])] = entry
+        else:
+            record[pr["kind"]] = entry
+
+def _save(best):
+    global _records
+    _records = {"version": history_version(), "best": best}
+    if not database.enabled():
+        # the stamp lets the next session trust the file without rescanning
+        save_json(RECORDS_FILE, {"stamp": list(file_stamp(history_file()) or []), "best": best}, compact=True)
+
+def rebuild():
+    """Recompute every record from the full history."""
+    best = {}
+    for workout in load_workout():
+        _apply(best, workout, _compare(best, workout))
+    _save(best)
+    return best
+
+def _best():
+    global _records
+    version = history_version()
+    if _records is not None and _records["version"] == version:
+        return _records["best"]
+    if _records is None and not database.enabled() and RECORDS_FILE.exists():
+        stored = load_json(RECORDS_FILE)
+        if isinstance(stored, dict) and stored.get("stamp") == list(file_stamp(history_file()) or []):
+            _records = {"version": version, "best": stored["best"]}
+            return _records["best"]
+    return rebuild()
+
+
+# ---------- QUERIES ----------
+def get_records(exercise_id):
+    """Current records for exercise_id, or None if it was never logged with sets."""
+    return _best().get(exercise_id)
+
+def check_workout(workout):
+    """PRs a not-yet-saved workout would set, ignoring exercises logged for the first time."""
+    return [pr for pr in _compare(_best(), workout) if pr["previous"] is not None]
+
+def is_pr(exercise_id, weight, reps):
+    """True if this single set beats the heaviest weight, best 1RM or best reps at that weight."""
+    record = _best().get(exercise_id)
+    if record is None:
+        return False
+    at_weight = record["reps_at_weight"].get(_weight_key(weight))
+    return (
+        weight > record["max_weight"]["value"]
+        or float(estimated_1rm(weight, reps)) > record["best_1rm"]["value"]
+        or (at_weight is not None and reps > at_weight["value"])
+    )
+
+def _on_workout_added(workout):
+    if _records is not None and _records["version"] == history_version():
+        best = _records["best"]
+        _apply(best, workout, _compare(best, workout))
+        _save(best)
+
+
+add_workout_listener(_on_workout_added)
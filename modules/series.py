@@ -0,0 +1,205 @@
+import numpy as np
+from modules import database
+from modules.models import SetColumns
+from modules.stats import history_columns, month_index, week_index, week_start
+from modules.workout import add_workout_listener, history_version
+
+# Columnar per-exercise history for the Logs graph, one row per logged entry with sets.
+# timestamp is datetime64[s] (from the workout id), the rest are float64.
+COLUMNS = ("timestamp", "avg_weight", "top_set", "volume", "reps")
+
+# How each column is combined when sessions are rolled up per week/month
+ROLLUP = {"avg_weight": "mean", "top_set": "max", "volume": "sum", "reps": "sum"}
+
+
+class ExerciseSeries:
+    """Growable column arrays for one exercise, kept sorted by timestamp."""
+
+    def __init__(self, capacity=16):
+        self.length = 0
+        self._timestamp = np.empty(capacity, dtype="datetime64[s]")
+        self._values = np.empty((len(COLUMNS) - 1, capacity), dtype=np.float64)
+        self._rollups = {}   # period -> (length it was built at, columns)
+
+    @classmethod
+    def from_columns(cls, timestamp, values):
+        """Series over sorted timestamps and a (len(COLUMNS) - 1, n) value array."""
+        series = cls(capacity=0)
+        series._timestamp = np.asarray(timestamp, dtype="datetime64[s]")
+        series._values = np.asarray(values, dtype=np.float64)
+        series.length = series._timestamp.size
+        return series
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, column):
+        """Read-only view of a column, no copy."""
+        if column == "timestamp":
+            view = self._timestamp[:self.length]
+        else:
+            view = self._values[COLUMNS.index(column) - 1, :self.length]
+        view.flags.writeable = False
+        return view
+
+    def _grow(self):
+        capacity = max(16, self._timestamp.size * 2)
+        timestamp = np.empty(capacity, dtype=self._timestamp.dtype)
+        timestamp[:self.length] = self._timestamp[:self.length]
+        values = np.empty((self._values.shape[0], capacity), dtype=np.float64)
+        values[:, :self.length] = self._values[:, :self.length]
+        self._timestamp, self._values = timestamp, values
+
+    def append(self, timestamp, values):
+        if self.length == self._timestamp.size:
+            self._grow()
+        n = self.length
+        # new sessions are nearly always the latest, otherwise shift the tail to keep order
+        pos = n if n == 0 or timestamp >= self._timestamp[n - 1] else int(
+            np.searchsorted(self._timestamp[:n], timestamp, side="right"))
+        if pos < n:
+            self._timestamp[pos + 1:n + 1] = self._timestamp[pos:n].copy()
+            self._values[:, pos + 1:n + 1] = self._values[:, pos:n].copy()
+        self._timestamp[pos] = timestamp
+        self._values[:, pos] = values
+        self.length = n + 1
+
+    def window(self, start=None, end=None):
+        """(lo, hi) row range with start <= timestamp <= end, found by binary search."""
+        timestamps = self._timestamp[:self.length]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, np.datetime64(start, "s"), side="left"))
+        hi = self.length if end is None else int(np.searchsorted(timestamps, np.datetime64(end, "s"), side="right"))
+        return lo, hi
+
+    def rollup(self, period):
+        """Columns aggregated per "week" (starting Monday) or "month", one row per period with sessions.
+
+        Cached until the next append, so a long history is only summarised once.
+        """
+        cached = self._rollups.get(period)
+        if cached is not None and cached[0] == self.length:
+            return cached[1]
+        timestamps = self._timestamp[:self.length]
+        if period == "week":
+            keys = week_index(timestamps)
+            starts = week_start(keys)
+        elif period == "month":
+            keys = month_index(timestamps)
+            starts = keys.astype("datetime64[M]")
+        else:
+            raise ValueError(f"Unknown period: {period}")
+
+        first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if self.length else np.array([], dtype=np.int64)
+        counts = np.diff(np.r_[first, self.length])
+        columns = {"timestamp": starts[first].astype("datetime64[s]")}
+        for name, how in ROLLUP.items():
+            values = self[name]
+            if not self.length:
+                columns[name] = values.copy()
+            elif how == "max":
+                columns[name] = np.maximum.reduceat(values, first)
+            else:
+                totals = np.add.reduceat(values, first)
+                columns[name] = totals / counts if how == "mean" else totals
+        for column in columns.values():
+            column.flags.writeable = False
+        self._rollups[period] = (self.length, columns)
+        return columns
+
+
+# {"version": history_version() it was built for, "series": {exercise_id: ExerciseSeries or None},
+#  "complete": False when series are queried one exercise at a time (database mode)}
+_store = None
+
+
+def _entry_row(sets):
+    if isinstance(sets, SetColumns):
+        weights = np.asarray(sets.weights, dtype=np.float64)
+        reps = np.asarray(sets.reps, dtype=np.float64)
+    else:
+        weights = np.array([s["weight"] for s in sets], dtype=np.float64)
+        reps = np.array([s["reps"] for s in sets], dtype=np.float64)
+    return (weights.mean(), weights.max(), float(weights @ reps), reps.sum())
+
+def _record(series, workout, complete=True):
+    try:
+        timestamp = np.datetime64(workout["id"], "s")
+    except (KeyError, ValueError):
+        return
+    for exercise in workout.get("exercises", []):
+        sets = exercise.get("sets", [])
+        exercise_id = exercise["exercise_id"]
+        if not sets or (not complete and exercise_id not in series):
+            continue   # not queried yet: the query will include this workout
+        if series.get(exercise_id) is None:
+            series[exercise_id] = ExerciseSeries()
+        series[exercise_id].append(timestamp, _entry_row(sets))
+
+def _from_columns(columns, exercise_ids):
+    """{exercise_id: ExerciseSeries} from flatten()-style set columns, in a few vectorized passes."""
+    keep = ~np.isnat(columns["timestamp"])
+    entry = columns["entry"][keep]
+    if entry.size == 0:
+        return {}
+    weight = np.asarray(columns["weight"][keep], dtype=np.float64)
+    reps = np.asarray(columns["reps"][keep], dtype=np.float64)
+    # an entry's sets are adjacent rows: reduce each run to one session row
+    first = np.flatnonzero(np.r_[True, entry[1:] != entry[:-1]])
+    counts = np.diff(np.r_[first, entry.size])
+    values = np.vstack([
+        np.add.reduceat(weight, first) / counts,
+        np.maximum.reduceat(weight, first),
+        np.add.reduceat(weight * reps, first),
+        np.add.reduceat(reps, first),
+    ])
+    timestamp = columns["timestamp"][keep][first]
+    exercise = columns["exercise"][keep][first]
+    # by exercise, then time; lexsort is stable so same-time sessions keep history order like append()
+    order = np.lexsort((timestamp, exercise))
+    exercise, timestamp, values = exercise[order], timestamp[order], values[:, order]
+    bounds = np.r_[np.flatnonzero(np.r_[True, exercise[1:] != exercise[:-1]]), exercise.size]
+    return {
+        exercise_ids[exercise[lo]]: ExerciseSeries.from_columns(timestamp[lo:hi], values[:, lo:hi])
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    }
+
+def _query_series(exercise_id):
+    # database mode: one exercise's sessions through its index instead of reading every workout
+    timestamps, values = [], []
+    for workout_id, *row in database.get_exercise_sessions(exercise_id):
+        try:
+            timestamps.append(np.datetime64(workout_id, "s"))
+        except ValueError:
+            continue
+        values.append(row)
+    if not timestamps:
+        return None
+    timestamp = np.array(timestamps, dtype="datetime64[s]")
+    # stable, so same-time sessions keep history order like _from_columns()
+    order = np.argsort(timestamp, kind="stable")
+    return ExerciseSeries.from_columns(timestamp[order], np.array(values, dtype=np.float64).T[:, order])
+
+def rebuild():
+    """Rebuild every series from the full workout history (database: start over, series are queried on use)."""
+    global _store
+    complete = not database.enabled()
+    series = _from_columns(*history_columns()) if complete else {}
+    _store = {"version": history_version(), "series": series, "complete": complete}
+    return series
+
+def get_series(exercise_id):
+    """ExerciseSeries for exercise_id, or None if it has never been logged with sets."""
+    if _store is None or _store["version"] != history_version():
+        rebuild()
+    series = _store["series"]
+    if not _store["complete"] and exercise_id not in series:
+        series[exercise_id] = _query_series(exercise_id)
+    return series.get(exercise_id)
+
+def _on_workout_added(workout):
+    # only extend a store that is current, a stale one gets rebuilt on next use anyway
+    if _store is not None and _store["version"] == history_version():
+        _record(_store["series"], workout, _store["complete"])
+
+
+add_workout_listener(_on_workout_added)
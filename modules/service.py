@@ -0,0 +1,186 @@
+import csv
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+from utils.json_handler import save_json
+from modules.exercises import load_exercises
+from modules.models import to_json
+from modules.workout import add_workouts, get_logged_exercises, load_workout
+
+# Headless entry points over the data modules, used by cli.py and usable from any
+# script: nothing here touches Tk. Like the app, paths are relative to the repo root.
+
+# CSV import columns, one row per set. workout_id is the workout's ISO timestamp
+# (a bare date works too, as midnight); rows sharing it form one workout, and
+# consecutive rows of the same exercise one entry. exercise_id may be left out
+# if title matches an exercise in the library.
+CSV_FIELDS = ("workout_id", "exercise_id", "title", "weight", "reps")
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".json": "json"}
+
+
+def _format(path, fmt):
+    fmt = fmt or FORMATS.get(Path(path).suffix.lower())
+    if fmt not in FORMATS.values():
+        raise ValueError(f"Unknown format for {path}, use one of: {', '.join(FORMATS.values())}")
+    return fmt
+
+def _workout_id(value):
+    # normalise to the id format the app uses, e.g. "2025-01-31T18:05:00"
+    if len(value) == 10:
+        return f"{date.fromisoformat(value).isoformat()}T00:00:00"
+    return datetime.fromisoformat(value).isoformat(timespec="seconds")
+
+
+# ---------- IMPORT ----------
+def read_csv_workouts(path):
+    """Workout dicts from a CSV of sets (see CSV_FIELDS), in one pass over the rows."""
+    by_title = {ex["title"].lower(): ex for ex in load_exercises()}
+    titles = {ex["id"]: ex["title"] for ex in by_title.values()}
+    workouts = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        # line 1 is the header
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                workout_id = _workout_id(row["workout_id"].strip())
+                exercise_id = (row.get("exercise_id") or "").strip()
+                title = (row.get("title") or "").strip()
+                if not exercise_id:
+                    exercise_id = by_title[title.lower()]["id"]
+                s = {"weight": float(row["weight"]), "reps": int(row["reps"])}
+            except (KeyError, ValueError, AttributeError) as e:
+                raise ValueError(f"{path}, line {line}: bad row {row!r} ({e!r})") from None
+
+            workout = workouts.get(workout_id)
+            if workout is None:
+                workout = workouts[workout_id] = {"id": workout_id, "date": workout_id[:10], "exercises": []}
+            entries = workout["exercises"]
+            if not entries or entries[-1]["exercise_id"] != exercise_id:
+                entries.append({"exercise_id": exercise_id, "title": titles.get(exercise_id, title or exercise_id), "sets": []})
+            entries[-1]["sets"].append(s)
+    return list(workouts.values())
+
+def _check_workout(workout, where):
+    # the shape the app relies on: an id, and exercise entries with numeric sets
+    if not isinstance(workout, dict) or not isinstance(workout.get("id"), str):
+        raise ValueError(f"{where}: not a workout with an \"id\": {workout!r}")
+    exercises = workout.get("exercises", [])
+    if not isinstance(exercises, list):
+        raise ValueError(f"{where}: \"exercises\" must be a list")
+    for entry in exercises:
+        if not isinstance(entry, dict) or "exercise_id" not in entry:
+            raise ValueError(f"{where}: exercise entry without an \"exercise_id\": {entry!r}")
+        sets = entry.get("sets", [])
+        if not isinstance(sets, list) or not all(
+            isinstance(s, dict) and isinstance(s.get("weight"), (int, float)) and isinstance(s.get("reps"), (int, float))
+            for s in sets
+        ):
+            raise ValueError(f"{where}: sets of {entry['exercise_id']!r} need a numeric weight and reps")
+    return workout
+
+def read_jsonl_workouts(path):
+    """Workout dicts from a JSON-Lines file with one workout per line."""
+    workouts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                workout = json.loads(text)
+            except ValueError as e:
+                raise ValueError(f"{path}, line {line}: not valid JSON ({e})") from None
+            workouts.append(_check_workout(workout, f"{path}, line {line}"))
+    return workouts
+
+def read_json_workouts(path):
+    """Workout dicts from a JSON file holding a list of workouts (like workouts.json)."""
+    # plain json, not load_json: that one is for the app's own files and falls back to
+    # backups or moves a broken file aside, neither of which is wanted for an input file
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            workouts = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: not valid JSON ({e})") from None
+    if not isinstance(workouts, list):
+        raise ValueError(f"{path}: expected a list of workouts")
+    return [_check_workout(workout, f"{path}, record {i}") for i, workout in enumerate(workouts, start=1)]
+
+def import_workouts(path, fmt=None):
+    """Add every workout in a CSV, JSONL or JSON file with one write; returns the number added.
+
+    Nothing is added if any workout id is already in the history. Raises
+    ValueError for a missing file or one that can't be read as workouts.
+    """
+    fmt = _format(path, fmt)
+    if not Path(path).is_file():
+        raise ValueError(f"{path}: no such file")
+    reader = {"csv": read_csv_workouts, "jsonl": read_jsonl_workouts, "json": read_json_workouts}[fmt]
+    return len(add_workouts(reader(path)))
+
+
+# ---------- EXPORT ----------
+def iter_workouts(start=None, end=None, exercise_ids=None):
+    """Workouts dated start..end (inclusive dates), as JSON dicts.
+
+    With exercise_ids, only workouts logging one of them are kept, trimmed to those entries.
+    """
+    low = start.isoformat() if start else None
+    high = end.isoformat() if end else None
+    wanted = set(exercise_ids) if exercise_ids else None
+    for workout in load_workout():
+        day = workout.get("id", "")[:10]
+        if (low and day < low) or (high and day > high):
+            continue
+        data = to_json(workout)
+        if wanted is not None:
+            data["exercises"] = [e for e in data.get("exercises", []) if e.get("exercise_id") in wanted]
+            if not data["exercises"]:
+                continue
+        yield data
+
+def export_workouts(path, start=None, end=None, exercise_ids=None, fmt=None):
+    """Write the filtered workouts (see iter_workouts) as JSONL or JSON; returns how many."""
+    fmt = _format(path, fmt)
+    workouts = iter_workouts(start, end, exercise_ids)
+    if fmt == "json":
+        workouts = list(workouts)
+        save_json(path, workouts)
+        return len(workouts)
+    if fmt != "jsonl":
+        raise ValueError("Workouts export as jsonl or json")
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for workout in workouts:
+            f.write(json.dumps(workout, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+# ---------- REPORTS ----------
+def report(today=None, weeks=8, top=10):
+    """Plain-text stats report: totals and streaks, the last weeks, and records of the most logged exercises."""
+    # imported here: numpy is only needed once a report is asked for
+    from modules.records import get_records
+    from modules.stats import get_stats
+
+    engine = get_stats()
+    summary = engine.summary(today)
+    lines = [
+        f"Workouts: {summary['total_workouts']} ({summary['workouts_this_week']} this week)",
+        f"Sets: {summary['total_sets']}, volume: {summary['total_volume']:.0f} kg",
+        f"Streak: {summary['current_streak_weeks']} weeks (longest {summary['longest_streak_weeks']})",
+        "",
+        f"{'Week of':<12} {'workouts':>8} {'sets':>6} {'volume':>10}",
+    ]
+    for monday, totals in engine.weekly_summary()[-weeks:]:
+        lines.append(f"{monday.isoformat():<12} {totals['workouts']:>8} {totals['sets']:>6} {totals['volume']:>10.0f}")
+
+    titles = get_logged_exercises()
+    lines += ["", f"{'Exercise':<32} {'sets':>6} {'max kg':>7} {'1RM':>7}"]
+    for exercise_id in sorted(engine.set_count, key=engine.set_count.get, reverse=True)[:top]:
+        records = get_records(exercise_id)
+        if records is None:
+            continue
+        lines.append(f"{titles.get(exercise_id, exercise_id)[:32]:<32} {engine.set_count[exercise_id]:>6} "
+                     f"{records['max_weight']['value']:>7.1f} {records['best_1rm']['value']:>7.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,240 @@
+from datetime import date
+
+import numpy as np
+from modules.models import SetColumns
+from modules.workout import add_workout_listener, archived_history, history_version, load_workout
+
+# Days between the Monday that starts numpy's week 0 (1969-12-29) and the epoch (a Thursday)
+_EPOCH_WEEKDAY = 3
+
+
+def _timestamp(workout):
+    # workouts are dated by their id (ISO timestamp), same as the Logs graph
+    try:
+        return np.datetime64(workout["id"], "s")
+    except (KeyError, ValueError):
+        return np.datetime64("NaT", "s")
+
+def week_index(when):
+    """Monday-based week number of a datetime64 array/scalar or a date."""
+    days = np.asarray(np.datetime64(when, "D") if isinstance(when, date) else when, dtype="datetime64[D]")
+    return (days.astype(np.int64) + _EPOCH_WEEKDAY) // 7
+
+def week_start(index):
+    """Monday (datetime64[D]) that starts week `index`; works on arrays too."""
+    if np.ndim(index):
+        return (np.asarray(index, dtype=np.int64) * 7 - _EPOCH_WEEKDAY).astype("datetime64[D]")
+    return np.datetime64(int(index) * 7 - _EPOCH_WEEKDAY, "D")
+
+def month_index(when):
+    return np.asarray(np.datetime64(when, "M") if isinstance(when, date) else when, dtype="datetime64[M]").astype(np.int64)
+
+def estimated_1rm(weight, reps):
+    """Epley estimate; a single rep is its own 1RM."""
+    weight = np.asarray(weight, dtype=np.float64)
+    reps = np.asarray(reps, dtype=np.float64)
+    return np.where(reps <= 1, weight, weight * (1 + reps / 30))
+
+def flatten(workouts):
+    """Flatten the history into one row per set, in a single pass.
+
+    Returns (columns, exercise_ids). columns holds "workout" (index into
+    workouts), "entry" (running index of the exercise entries that have sets),
+    "timestamp", "exercise" (index into exercise_ids), "weight" and "reps"
+    arrays, plus "workout_timestamp" with one entry per workout.
+    """
+    codes = {}
+    workout_col, entry_col, exercise_col, weight_col, reps_col = [], [], [], [], []
+    workout_ts = []
+    entries = 0
+    for i, workout in enumerate(workouts):
+        workout_ts.append(_timestamp(workout))
+        for exercise in workout.get("exercises", []):
+            code = codes.setdefault(exercise["exercise_id"], len(codes))
+            sets = exercise.get("sets", [])
+            if not sets:
+                continue
+            workout_col.extend([i] * len(sets))
+            entry_col.extend([entries] * len(sets))
+            exercise_col.extend([code] * len(sets))
+            entries += 1
+            if isinstance(sets, SetColumns):
+                # packed sets: copy the columns as they are
+                weight_col.extend(sets.weights)
+                reps_col.extend(sets.reps)
+            else:
+                for s in sets:
+                    weight_col.append(s["weight"])
+                    reps_col.append(s["reps"])
+
+    workout_timestamp = np.array(workout_ts, dtype="datetime64[s]")
+    workout_index = np.array(workout_col, dtype=np.int64)
+    columns = {
+        "workout": workout_index,
+        "entry": np.array(entry_col, dtype=np.int64),
+        "timestamp": workout_timestamp[workout_index],
+        "exercise": np.array(exercise_col, dtype=np.int64),
+        "weight": np.array(weight_col, dtype=np.float64),
+        "reps": np.array(reps_col, dtype=np.float64),
+        "workout_timestamp": workout_timestamp,
+    }
+    return columns, list(codes)
+
+def history_columns():
+    """flatten() of the whole history.
+
+    With the columnar archive the archived sets come straight from its
+    memory-mapped column files and only workouts added since are flattened.
+    """
+    archived = archived_history()
+    if archived is None:
+        return flatten(load_workout())
+    segment, added = archived
+    columns, exercise_ids = flatten(added)
+    # number the added workouts/entries after the archived ones, and their exercises into one list
+    codes = {ex_id: code for code, ex_id in enumerate(segment.exercise_ids)}
+    remap = np.array([codes.setdefault(ex_id, len(codes)) for ex_id in exercise_ids], dtype=np.int64)
+    archived_columns = segment.columns()
+    columns["workout"] += len(segment)
+    columns["entry"] += segment.entries
+    columns["exercise"] = remap[columns["exercise"]] if remap.size else columns["exercise"]
+    return {name: np.concatenate([archived_columns[name], column]) for name, column in columns.items()}, list(codes)
+
+
+def _group_totals(keys, weights=None):
+    """{key: (count, sum of weights)} for an int key array."""
+    if keys.size == 0:
+        return {}
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=unique.size)
+    sums = np.bincount(inverse, weights=weights, minlength=unique.size) if weights is not None else counts
+    return {int(k): (int(c), float(v)) for k, c, v in zip(unique, counts, sums)}
+
+
+class StatsEngine:
+    """Aggregates over the workout history.
+
+    Built with vectorized passes over the flattened sets (or the (columns,
+    exercise_ids) of flatten() / history_columns() directly), then kept
+    current by add() in O(sets of the new workout).
+    """
+
+    def __init__(self, workouts=(), columns=None):
+        self.total_workouts = 0
+        self.total_sets = 0
+        self.total_volume = 0.0
+        self.volume = {}        # exercise_id -> sum of weight x reps
+        self.set_count = {}     # exercise_id -> number of sets
+        self.best_1rm = {}      # exercise_id -> best estimated 1RM
+        self.weekly = {}        # week index -> {"workouts", "sets", "volume"}
+        self.monthly = {}       # month index -> {"workouts", "sets", "volume"}
+        self._build(*(columns or flatten(workouts)))
+
+    def _build(self, columns, exercise_ids):
+        weight, reps, exercise = columns["weight"], columns["reps"], columns["exercise"]
+        set_volume = weight * reps
+        n = len(exercise_ids)
+
+        self.total_workouts = int(columns["workout_timestamp"].size)
+        self.total_sets = int(weight.size)
+        self.total_volume = float(set_volume.sum())
+        self.volume = dict(zip(exercise_ids, np.bincount(exercise, weights=set_volume, minlength=n).tolist()))
+        self.set_count = dict(zip(exercise_ids, np.bincount(exercise, minlength=n).tolist()))
+        best = np.full(n, -np.inf)
+        np.maximum.at(best, exercise, estimated_1rm(weight, reps))
+        self.best_1rm = {ex_id: value for ex_id, value in zip(exercise_ids, best.tolist()) if value > -np.inf}
+
+        dated = ~np.isnat(columns["workout_timestamp"])
+        dated_sets = ~np.isnat(columns["timestamp"])
+        for table, index in ((self.weekly, week_index), (self.monthly, month_index)):
+            workouts_per = _group_totals(index(columns["workout_timestamp"][dated]))
+            sets_per = _group_totals(index(columns["timestamp"][dated_sets]), set_volume[dated_sets])
+            for key in workouts_per.keys() | sets_per.keys():
+                sets, volume = sets_per.get(key, (0, 0.0))
+                table[key] = {"workouts": workouts_per.get(key, (0, 0))[0], "sets": sets, "volume": volume}
+
+    def add(self, workout):
+        """Fold one new workout into every aggregate."""
+        self.total_workouts += 1
+        timestamp = _timestamp(workout)
+        periods = []
+        if not np.isnat(timestamp):
+            for table, key in ((self.weekly, int(week_index(timestamp))), (self.monthly, int(month_index(timestamp)))):
+                bucket = table.setdefault(key, {"workouts": 0, "sets": 0, "volume": 0.0})
+                bucket["workouts"] += 1
+                periods.append(bucket)
+
+        for exercise in workout.get("exercises", []):
+            ex_id = exercise["exercise_id"]
+            for s in exercise.get("sets", []):
+                set_volume = s["weight"] * s["reps"]
+                self.total_sets += 1
+                self.total_volume += set_volume
+                self.volume[ex_id] = self.volume.get(ex_id, 0.0) + set_volume
+                self.set_count[ex_id] = self.set_count.get(ex_id, 0) + 1
+                one_rm = float(estimated_1rm(s["weight"], s["reps"]))
+                if one_rm > self.best_1rm.get(ex_id, -np.inf):
+                    self.best_1rm[ex_id] = one_rm
+                for bucket in periods:
+                    bucket["sets"] += 1
+                    bucket["volume"] += set_volume
+
+    # ---------- QUERIES ----------
+    def workouts_this_week(self, today=None):
+        key = int(week_index(today or date.today()))
+        return self.weekly.get(key, {}).get("workouts", 0)
+
+    def weekly_summary(self):
+        """List of (monday, totals) sorted by week."""
+        return [(week_start(k).item(), self.weekly[k]) for k in sorted(self.weekly)]
+
+    def monthly_summary(self):
+        """List of ("YYYY-MM", totals) sorted by month."""
+        return [(str(np.datetime64(k, "M")), self.monthly[k]) for k in sorted(self.monthly)]
+
+    def streaks(self, today=None):
+        """(current, longest) run of consecutive weeks with at least one workout.
+
+        The current streak is still alive if the last trained week is this one or the one before.
+        """
+        weeks = np.array(sorted(k for k, v in self.weekly.items() if v["workouts"]), dtype=np.int64)
+        if weeks.size == 0:
+            return 0, 0
+        breaks = np.flatnonzero(np.diff(weeks) != 1)
+        run_ends = np.append(breaks, weeks.size - 1)
+        run_starts = np.insert(breaks + 1, 0, 0)
+        lengths = run_ends - run_starts + 1
+        this_week = int(week_index(today or date.today()))
+        current = int(lengths[-1]) if this_week - weeks[-1] <= 1 else 0
+        return current, int(lengths.max())
+
+    def summary(self, today=None):
+        current, longest = self.streaks(today)
+        return {
+            "total_workouts": self.total_workouts,
+            "workouts_this_week": self.workouts_this_week(today),
+            "total_sets": self.total_sets,
+            "total_volume": self.total_volume,
+            "current_streak_weeks": current,
+            "longest_streak_weeks": longest,
+        }
+
+
+# {"version": history_version() it was built for, "engine": StatsEngine}
+_stats = None
+
+
+def get_stats():
+    """Shared StatsEngine, rebuilt only when the history was edited or reloaded."""
+    global _stats
+    version = history_version()
+    if _stats is None or _stats["version"] != version:
+        _stats = {"version": version, "engine": StatsEngine(columns=history_columns())}
+    return _stats["engine"]
+
+def _on_workout_added(workout):
+    if _stats is not None and _stats["version"] == history_version():
+        _stats["engine"].add(workout)
+
+
+add_workout_listener(_on_workout_added)
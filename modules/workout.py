@@ -1,34 +1,401 @@
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from utils.json_handler import load_json, save_json
-from utils.helpers import add
+from utils.instrument import timed
+from utils.json_handler import load_json, restore_backup, save_json
+from utils.journal import read_journal, append_journal, extend_journal, write_journal, tombstone
+from utils.repository import file_stamp, generation, invalidate, load_cached, remember, store
+from utils.helpers import Batch, add, add_many, edit, remove
+from utils.tasks import run_in_background
+from modules import archive, database
+from modules.models import Workout, to_json, workouts_from_json, workouts_to_json
 
 WORKOUT_FILE = Path("data/workouts.json")
+# Append-only JSON-Lines storage, used instead of WORKOUT_FILE once it exists
+WORKOUT_JOURNAL = Path("data/workouts.jsonl")
+# Binary (MessagePack) archive, used instead of WORKOUT_FILE once it exists; needs msgpack
+WORKOUT_ARCHIVE = Path("data/workouts.msgpack")
+# Columnar, memory-mapped archive (see modules/archive.py), used instead of all of the above once it exists.
+# Its delta is merged into the columns in the background once it grows past this size:
+ARCHIVE_MERGE_BYTES = 256 * 1024
+# Last logged sets per exercise_id, so get_previous_sets doesn't scan the history
+LATEST_SETS_FILE = Path("data/latest_sets.json")
 
+# {"stamp": [mtime_ns, size] of the workout file it was built from, "sets": {exercise_id: sets}}
+_latest_sets = None
+
+# Derived data (series, stats, records) follows the history through these:
+# listeners are called with each added workout, and _changes is bumped whenever
+# workouts are edited, removed or replaced so they know to rebuild.
+_listeners = []
+_changes = 0
+_merge_scheduled = False
+
+def add_workout_listener(listener):
+    """Call listener(workout) after every add_workout."""
+    _listeners.append(listener)
+
+def _history_changed():
+    global _changes
+    _changes += 1
+
+def history_version():
+    """Token that changes when the history is edited or reloaded from disk, but not on add_workout."""
+    if database.enabled():
+        return ("db", _changes)
+    load_workout()  # re-parses only if the file changed on disk
+    return (generation(history_file()), _changes)
+
+def _journal_file():
+    """The journal that add/edit/remove append to: the archive's delta or workouts.jsonl. None if neither is used."""
+    if archive.exists():
+        return archive.DELTA_FILE
+    return WORKOUT_JOURNAL if WORKOUT_JOURNAL.exists() else None
+
+def _use_journal():
+    return _journal_file() is not None
+
+def _snapshot_file():
+    # the whole-list file: the msgpack archive if there is one, else the JSON array
+    return WORKOUT_ARCHIVE if WORKOUT_ARCHIVE.exists() else WORKOUT_FILE
+
+def history_file():
+    """The file the workout history currently lives in."""
+    if database.enabled():
+        return database.DATABASE_FILE
+    return _journal_file() or _snapshot_file()
+
+def _read_history(path):
+    # the history is held in memory as compact Workout models, see modules/models.py
+    if path == archive.DELTA_FILE:
+        # archived workouts come with their sets mapped from the column files
+        data = read_journal(path, base=archive.current().workouts())
+    else:
+        data = read_journal(path) if path == WORKOUT_JOURNAL else load_json(path)
+    return workouts_from_json(data or [])
+
+def _save_history(path, workouts):
+    if path == archive.DELTA_FILE:
+        # a new segment with everything, then an empty delta; a crash in between
+        # only means the old delta gets folded over the new segment again
+        archive.write_archive(workouts)
+        write_journal(path, [])
+        return
+    data = workouts_to_json(workouts)
+    if path == WORKOUT_JOURNAL:
+        write_journal(path, data)
+    else:
+        # no indentation: the history is machine-managed and by far the biggest file
+        save_json(path, data, compact=True)
+
+@timed()
 def load_workout():
-    if not WORKOUT_FILE.exists():
+    if database.enabled():
+        return database.load_workouts()
+    # a missing file with a .bak next to it is a save that crashed, not a new install
+    if not _use_journal() and not restore_backup(WORKOUT_ARCHIVE) and not restore_backup(WORKOUT_FILE):
         WORKOUT_FILE.parent.mkdir(parents=True, exist_ok=True)
         save_json(WORKOUT_FILE, [])
         return []
-    return load_json(WORKOUT_FILE) or []
+    return load_cached(history_file(), loader=_read_history)
+
+def _write_history(workout):
+    store(history_file(), workout, saver=_save_history)
 
+@timed()
 def save_workout(workout):
-    save_json(WORKOUT_FILE, workout)
+    if database.enabled():
+        database.save_workouts(workout)
+    else:
+        _write_history(workout)
+    _history_changed()
 
+def _journal(workout, *records):
+    """Append records to the journal and keep the cached list current."""
+    path = _journal_file()
+    if len(records) == 1:
+        append_journal(path, to_json(records[0]))
+    else:
+        extend_journal(path, [to_json(record) for record in records])
+    remember(path, workout)
+    if path == archive.DELTA_FILE and archive.delta_size() > ARCHIVE_MERGE_BYTES:
+        _schedule_merge()
+
+def _schedule_merge():
+    global _merge_scheduled
+    if not _merge_scheduled:
+        _merge_scheduled = True
+        run_in_background(merge_archive)
+
+def archived_history():
+    """(segment, added) when the history is the archive plus workouts only added since.
+
+    segment's column files then cover every set outside `added`, so aggregates
+    can read them instead of walking the models. None if the history isn't
+    archived, or the columns don't hold every archived set (see archive.columns_complete).
+    """
+    if database.enabled() or not archive.exists():
+        return None
+    workouts = load_workout()
+    segment = archive.current()
+    if not archive.columns_complete(segment):
+        return None
+    return segment, workouts[len(segment):]
+
+@timed()
 def add_workout(new_workout):
-    workout = load_workout()
-    updated, added = add(workout, new_workout)
-    save_workout(updated)
+    if database.enabled():
+        added = database.add_workout(new_workout)
+    else:
+        workout = load_workout()
+        index = _latest_sets_index()
+        updated, added = add(workout, Workout.from_json(new_workout))
+        if _use_journal():
+            _journal(updated, added)
+        else:
+            _write_history(updated)
+        _record_latest_sets(index, added)
+        _save_latest_sets(index)
+    for listener in _listeners:
+        listener(added)
     return added
 
-def get_previous_sets(exercise_id):
+@timed()
+def add_workouts(new_workouts):
+    """Add a batch of workouts with a single write (one transaction, journal append or file save).
+
+    Nothing is added if any id is already taken or repeats within the batch.
+    """
+    if database.enabled():
+        added = database.add_workouts(list(new_workouts))
+    else:
+        workout = load_workout()
+        index = _latest_sets_index()
+        updated, added = add_many(workout, [Workout.from_json(w) for w in new_workouts])
+        if _use_journal():
+            _journal(updated, *added)
+        else:
+            _write_history(updated)
+        for w in added:
+            _record_latest_sets(index, w)
+        _save_latest_sets(index)
+    for w in added:
+        for listener in _listeners:
+            listener(w)
+    return added
+
+@timed()
+def edit_workout(workout_id, updates):
+    if database.enabled():
+        database.edit_workout(workout_id, updates)
+    else:
+        workout = load_workout()
+        updated, _ = edit(workout, workout_id, updates)
+        if _use_journal():
+            _journal(updated, next(w for w in updated if w["id"] == workout_id))
+        else:
+            _write_history(updated)
+    _history_changed()
+    return workout_id
+
+@timed()
+def remove_workout(workout_id):
+    if database.enabled():
+        database.remove_workout(workout_id)
+    else:
+        workout = load_workout()
+        updated, _ = remove(workout, workout_id)
+        if _use_journal():
+            _journal(updated, tombstone(workout_id))
+        else:
+            _write_history(updated)
+    _history_changed()
+    return workout_id
+
+class _WorkoutBatch(Batch):
+    def add(self, new_item):
+        return super().add(Workout.from_json(new_item))
+
+@contextmanager
+def batch():
+    """Make many workout changes in memory and save them once when the block ends.
+
+        with workout.batch() as changes:
+            changes.add(new_workout)
+            changes.edit(workout_id, updates)
+            changes.remove(other_id)
+
+    With the journal that's a single append (records and tombstones), otherwise
+    one file save or one database transaction. If the block raises, nothing is
+    saved and the loaded history is left as it was.
+    """
+    changes = _WorkoutBatch(database.load_workouts() if database.enabled() else load_workout())
+    yield changes
+    if not changes.changed():
+        return
+    only_added = not changes.edited and not changes.removed
+    # fetched before writing, while its stamp still matches the file
+    index = _latest_sets_index() if only_added and not database.enabled() else None
+    if database.enabled():
+        database.save_workouts(changes.result())
+    elif _use_journal():
+        records = [tombstone(workout_id) for workout_id in changes.removed]
+        records += [changes.get(workout_id) for workout_id in changes.edited]
+        records += changes.added.values()
+        _journal(changes.result(), *records)
+    else:
+        _write_history(changes.result())
+
+    if only_added:
+        if index is not None:
+            for added in changes.added.values():
+                _record_latest_sets(index, added)
+            _save_latest_sets(index)
+        for added in changes.added.values():
+            for listener in _listeners:
+                listener(added)
+    else:
+        # derived data rebuilds; the latest-sets index notices the new file stamp
+        _history_changed()
+
+def migrate_workouts_to_journal():
+    """One-time move from the workouts.json array to the JSON-Lines journal.
+
+    The old file is kept next to it as workouts.json.migrated.
+    Returns the number of workouts migrated, or None if already migrated.
+    """
+    if _use_journal():
+        return None
+    source = _snapshot_file()
+    workouts = load_json(source) if source.exists() else []
+    WORKOUT_JOURNAL.parent.mkdir(parents=True, exist_ok=True)
+    write_journal(WORKOUT_JOURNAL, workouts)
+    if source.exists():
+        source.replace(source.with_name(source.name + ".migrated"))
+    return len(workouts)
+
+def pack_workouts():
+    """One-time move from workouts.json to the MessagePack archive (the JSON file is kept as .migrated).
+
+    Returns the number of workouts packed, or None if the history isn't in workouts.json.
+    """
+    if _use_journal() or WORKOUT_ARCHIVE.exists():
+        return None
+    workouts = _read_history(WORKOUT_FILE) if WORKOUT_FILE.exists() else []
+    store(WORKOUT_ARCHIVE, workouts, saver=_save_history)
+    if WORKOUT_FILE.exists():
+        WORKOUT_FILE.replace(WORKOUT_FILE.with_name(WORKOUT_FILE.name + ".migrated"))
+    return len(workouts)
+
+def compact_workouts():
+    """Fold edits and deletes in the journal back into one line per workout (for the archive: merge its delta)."""
+    path = _journal_file()
+    if path is None:
+        return None
+    workouts = _read_history(path)
+    store(path, workouts, saver=_save_history)
+    return len(workouts)
+
+def archive_workouts():
+    """One-time move of the history (JSON, msgpack or journal) into the columnar archive.
+
+    The old file is kept next to it with a .migrated suffix.
+    Returns the number of workouts archived, or None if already archived.
+    """
+    if archive.exists():
+        return None
+    source = WORKOUT_JOURNAL if WORKOUT_JOURNAL.exists() else _snapshot_file()
+    workouts = _read_history(source) if source.exists() else []
+    archive.write_archive(workouts)
+    write_journal(archive.DELTA_FILE, [])
+    if source.exists():
+        source.replace(source.with_name(source.name + ".migrated"))
+    invalidate(source)
+    return len(workouts)
+
+@timed()
+def merge_archive():
+    """Fold the archive's delta into a new segment; run in the background once the delta grows."""
+    global _merge_scheduled
+    _merge_scheduled = False
+    if database.enabled() or not archive.exists() or archive.delta_size() == 0:
+        return None
+    index = _latest_sets_index()
     workouts = load_workout()
+    store(archive.DELTA_FILE, workouts, saver=_save_history)
+    # same history, new file stamps: keep the latest-sets index from being rebuilt
+    _save_latest_sets(index)
+    return len(workouts)
 
-    #check workouts file in reverse order and load 
-    #the sets info from the latest one with the matching id
-    for workout in reversed(workouts):
+def _record_latest_sets(index, workout):
+    # walk backwards so the first entry of an exercise within a workout wins
+    for exercise in reversed(workout.get("exercises", [])):
+        index[exercise["exercise_id"]] = to_json(exercise.get("sets", []))
+
+def _save_latest_sets(index):
+    global _latest_sets
+    _latest_sets = {"stamp": list(file_stamp(history_file()) or []), "sets": index}
+    save_json(LATEST_SETS_FILE, _latest_sets, compact=True)
+
+def rebuild_latest_sets_index():
+    """Rebuild the latest-sets index from the full history."""
+    index = {}
+    for workout in load_workout():
+        _record_latest_sets(index, workout)
+    _save_latest_sets(index)
+    return index
+
+def _latest_sets_index():
+    """Latest-sets index, rebuilt only if the workout file changed behind our back."""
+    global _latest_sets
+    if _latest_sets is None and LATEST_SETS_FILE.exists():
+        stored = load_json(LATEST_SETS_FILE)
+        _latest_sets = stored if isinstance(stored, dict) else None
+
+    stamp = list(file_stamp(history_file()) or [])
+    if _latest_sets and _latest_sets.get("stamp") == stamp:
+        return _latest_sets["sets"]
+    return rebuild_latest_sets_index()
+
+@timed()
+def get_previous_sets(exercise_id):
+    if database.enabled():
+        return database.get_previous_sets(exercise_id)
+
+    #sets from the latest workout with the matching id
+    return _latest_sets_index().get(exercise_id, [])
+
+@timed()
+def get_logged_exercises():
+    """Map of exercise_id -> title for every exercise that appears in a workout."""
+    if database.enabled():
+        return database.get_logged_exercises()
+    logged = {}
+    for workout in load_workout():
         for exercise in workout.get("exercises", []):
-            if exercise.get("exercise_id") == exercise_id:
-                return exercise.get("sets", [])
-    return []
+            logged[exercise["exercise_id"]] = exercise.get("title", exercise["exercise_id"])
+    return logged
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Workout storage maintenance")
+    parser.add_argument("command", choices=["migrate", "pack", "archive", "compact", "reindex"])
+    args = parser.parse_args()
 
+    if args.command == "migrate":
+        count = migrate_workouts_to_journal()
+        print("Already using the journal." if count is None else f"Migrated {count} workouts to {WORKOUT_JOURNAL}")
+    elif args.command == "pack":
+        count = pack_workouts()
+        print("Nothing to pack: history isn't in workouts.json." if count is None
+              else f"Packed {count} workouts into {WORKOUT_ARCHIVE}")
+    elif args.command == "archive":
+        count = archive_workouts()
+        print("Already archived." if count is None else f"Archived {count} workouts into {archive.ARCHIVE_DIR}")
+    elif args.command == "reindex":
+        print(f"Indexed latest sets for {len(rebuild_latest_sets_index())} exercises")
+    else:
+        count = compact_workouts()
+        print("No journal to compact." if count is None else f"Compacted {history_file()} to {count} workouts")
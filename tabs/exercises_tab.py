@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from modules.exercises import *
+from tabs.virtual_list import VirtualList
+from utils.tasks import TaskRunner, data_lock
+from utils.instrument import timed
 
 
 class ExercisesTab(ttk.Frame):
@@ -13,6 +16,12 @@ class ExercisesTab(ttk.Frame):
         # Tag clear button
         ttk.Button(frame, text="Clear", command=self._on_clear_search).pack(side="left", padx=5)
 
+        # How selected tags combine: exercises with all / any / none of them
+        self.tag_mode = ttk.Combobox(frame, values=["all", "any", "none"], width=5, state="readonly")
+        self.tag_mode.set("all")
+        self.tag_mode.pack(side="left", padx=5)
+        self.tag_mode.bind("<<ComboboxSelected>>", lambda e: self._update_exercise_list())
+
         # Entry field with live search
         self.search_var = tk.StringVar()
         self.entry = ttk.Entry(frame, textvariable=self.search_var)
@@ -31,7 +40,7 @@ class ExercisesTab(ttk.Frame):
         main_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
         # Tags listbox
-        self.tag_listbox = tk.Listbox(main_frame, height=15, width=20)
+        self.tag_listbox = tk.Listbox(main_frame, height=15, width=20, selectmode="multiple", exportselection=False)
         self.tag_listbox.pack(side="left", fill="both", padx=(0, 10), expand=True)
         self.tag_listbox.bind("<<ListboxSelect>>", self._on_tag_selected)
 
@@ -40,19 +49,20 @@ class ExercisesTab(ttk.Frame):
         tag_scrolly.pack(side="left", fill="y")
         self.tag_listbox.config(yscrollcommand=tag_scrolly.set)
 
-        # Exercise list
-        self.exercise_list = tk.Listbox(main_frame, height=15, width=30)
-        self.exercise_list.pack(side="left", fill="both", padx=(10, 10), expand=True)
-        self.exercise_list.bind("<Double-Button-1>", self._on_exercise_clicked)
+        # Exercise list (with its own scrollbar), only visible rows are rendered
+        self.exercise_list = VirtualList(
+            main_frame, height=15, width=30,
+            label=lambda ex: ex["title"],
+            on_activate=self.open_exercise_details,
+        )
+        self.exercise_list.pack(side="left", fill="both", padx=(10, 0), expand=True)
 
-        # ExerciceBox scrollbar
-        exercise_scrolly = tk.Scrollbar(main_frame, orient="vertical", command=self.exercise_list.yview)
-        exercise_scrolly.pack(side="left", fill="y")
-        self.exercise_list.config(yscrollcommand=exercise_scrolly.set)
+        # searches run in the background, a newer query cancels the one still pending
+        self.tasks = TaskRunner(self)
 
         self.displayed_exercises = []
-        self.tags = get_all_tags()
-        self.selected_tag = None
+        self.tags = []
+        self.selected_tags = []
         self._populate_tag_list()
         self._update_exercise_list()
 
@@ -91,7 +101,8 @@ class ExercisesTab(ttk.Frame):
 
     def _on_clear_search(self, *args):
         self._setup_placeholder()
-        self.selected_tag = None
+        self.selected_tags = []
+        self.tag_listbox.selection_clear(0, tk.END)
         self._update_exercise_list()
 
 
@@ -102,49 +113,39 @@ class ExercisesTab(ttk.Frame):
         if query == self.placeholder_text:
             query = None
 
-        self.exercise_list.delete(0, tk.END)
-
-        # Apply search 
-        results = search_exercises(query)
-
-        # Apply tag filter instead if one is selected
-        if self.selected_tag:
-            results = [ex for ex in results if self.selected_tag in ex.get("tags", [])]
-
-        self.displayed_exercises = results
-
-        if not results:
-            display_text = f"No exercises found for: {query}" if query else "No exercises found."
-            self.exercise_list.insert(tk.END, display_text)
-        else:
-            for ex in results:
-                self.exercise_list.insert(tk.END, ex["title"])
+        # Apply search and tag filter together
+        tag_filter = {
+            "all": {"all_tags": self.selected_tags},
+            "any": {"any_tags": self.selected_tags},
+            "none": {"no_tags": self.selected_tags},
+        }[self.tag_mode.get()]
+        display_text = f"No exercises found for: {query}" if query else "No exercises found."
 
+        # the search itself is timed as modules.exercises.search_exercises, on the worker
+        @timed("tabs.exercises_tab.ExercisesTab.show_results")
+        def show_results(results):
+            self.displayed_exercises = results
+            self.exercise_list.set_items(results, empty_text=display_text)
 
-    # ---------- DOUBLE-CLICK HANDLER ----------
-    def _on_exercise_clicked(self, event):
-        selection = self.exercise_list.curselection()
-        if not selection:
-            return
-        index = selection[0]
-        if index >= len(self.displayed_exercises):
-            return
-        ex = self.displayed_exercises[index]
-        self.open_exercise_details(ex)
+        self.tasks.submit(search_exercises, query, key="search", on_done=show_results, **tag_filter)
 
 
     # ---------- TAG HANDLERS ----------
     def _populate_tag_list(self):
-        """Fill the tag listbox with available tags."""
+        """Fill the tag listbox with available tags and their exercise counts, keeping the selection."""
+        with data_lock:
+            counts = get_tag_counts()
+        self.tags = list(counts)
+        self.selected_tags = [tag for tag in self.selected_tags if tag in counts]
         self.tag_listbox.delete(0, tk.END)
-        for tag in self.tags:
-            self.tag_listbox.insert(tk.END, tag)
+        for i, (tag, count) in enumerate(counts.items()):
+            self.tag_listbox.insert(tk.END, f"{tag} ({count})")
+            if tag in self.selected_tags:
+                self.tag_listbox.selection_set(i)
 
     def _on_tag_selected(self, event):
-        """Filter exercises by selected tag."""
-        selection = self.tag_listbox.curselection()
-        if selection:
-            self.selected_tag = self.tag_listbox.get(selection[0])        
+        """Filter exercises by the selected tags."""
+        self.selected_tags = [self.tags[i] for i in self.tag_listbox.curselection()]
         self._update_exercise_list()
 
 
@@ -325,9 +326,11 @@ class ExercisesTab(ttk.Frame):
                     if entries["unit"]:
                         exercise[name]["unit"] = entries["unit"].get()
                 normalized = normalize_exercise_data(exercise)
-                add_exercise(normalized)
+                with data_lock:
+                    add_exercise(normalized)
                 messagebox.showinfo("Success", f"Added new exercise: {exercise['title']}")
                 popup.destroy()
+                self._populate_tag_list()
                 self._update_exercise_list()
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save exercise:\n{e}")
@@ -435,8 +438,10 @@ class ExercisesTab(ttk.Frame):
                         updates[name]["unit"] = entries["unit"].get()
 
                 normalized = normalize_exercise_data(updates, existing_id=ex["id"])
-                edit_exercise(ex["id"], normalized)
+                with data_lock:
+                    edit_exercise(ex["id"], normalized)
                 messagebox.showinfo("Changed", f"Exercise '{ex['title']} has been changed.")
+                self._populate_tag_list()
                 self._update_exercise_list()
                 if popup: popup.destroy()
                 if parent_popup: parent_popup.destroy()
@@ -448,8 +453,10 @@ class ExercisesTab(ttk.Frame):
         confirm = messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete '{ex['title']}'?")
         if confirm:
             try:
-                remove_exercise(ex["id"])
+                with data_lock:
+                    remove_exercise(ex["id"])
                 messagebox.showinfo("Deleted", f"Exercise '{ex['title']}' has been removed.")
+                self._populate_tag_list()
                 self._update_exercise_list()
                 if parent: parent.destroy()
                 if parent_popup: parent_popup.destroy()
@@ -1,18 +1,27 @@
 import tkinter as tk
 from tkinter import ttk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from modules.workout import load_workout
-import matplotlib.dates as mdates
-from datetime import datetime, timedelta
+from modules.logs import logged_exercises, page_summaries, workout_details
+from modules.records import get_records
+from tabs.progress_graph import RANGES, ProgressGraph, load_view
+from utils.tasks import TaskRunner
+from utils.instrument import timed
 
 class LogsTab(ttk.Frame):
 
     def __init__(self, parent):
         super().__init__(parent)
 
+        # progress graph and past workouts are two pages of the tab
+        self.views = ttk.Notebook(self)
+        self.views.pack(fill="both", expand=True)
+        progress_frame = ttk.Frame(self.views)
+        self.views.add(progress_frame, text="Progress")
+        self.history_frame = ttk.Frame(self.views)
+        self.views.add(self.history_frame, text="Past workouts")
+        self.views.bind("<<NotebookTabChanged>>", lambda e: self._history_shown() and self._refresh_history())
+
         # Top section for dropdown
-        self.top_frame = ttk.Frame(self)
+        self.top_frame = ttk.Frame(progress_frame)
         self.top_frame.pack(side="top", fill="x", padx=20, pady=(20, 10))
 
         ttk.Label(self.top_frame, text="Select Exercise:").pack(side="top", padx=(50, 10), pady = 10)
@@ -22,22 +31,43 @@ class LogsTab(ttk.Frame):
         self.exercise_dropdown.pack(side="top", padx=(50, 10))
         self.exercise_dropdown.bind("<<ComboboxSelected>>", self.show_graph)
 
+        # visible time range of the graph
+        self.range_dropdown = ttk.Combobox(self.top_frame, state="readonly", width=30, values=list(RANGES))
+        self.range_dropdown.set("12 Weeks")
+        self.range_dropdown.pack(side="top", padx=(50, 10), pady=(5, 0))
+        self.range_dropdown.bind("<<ComboboxSelected>>", self.show_graph)
+
+        # personal records of the selected exercise
+        self.record_label = ttk.Label(self.top_frame, text="", foreground="gray")
+        self.record_label.pack(side="top", padx=(50, 10), pady=(5, 0))
+
         # Right section for graph
-        self.right_frame = ttk.Frame(self)
+        self.right_frame = ttk.Frame(progress_frame)
         self.right_frame.pack(side="top", fill="both", expand=True, padx=20, pady=(0, 20))
 
+        # Graph is created once and updated in place
+        self.graph = ProgressGraph(self.right_frame)
+
+        # history is read and aggregated in the background, widgets are updated when it's done
+        self.tasks = TaskRunner(self)
+
+        self.build_history()
+
         # Load data and populate dropdown
         self.exercise_select()
 
     def exercise_select(self):
-        self.workouts = load_workout()
+        self.tasks.submit(logged_exercises, key="exercises", on_done=self._fill_dropdown)
+        # past workouts are reloaded when next shown
+        self._history_stale = True
+        if self._history_shown():
+            self._refresh_history()
 
-        titles = set()
-        for workout in self.workouts:
-            for exercise in workout["exercises"]:
-                titles.add(exercise["title"])
+    def _fill_dropdown(self, logged):
+        # dropdown shows titles, graph data is looked up by exercise id
+        self.exercise_ids = {title: ex_id for ex_id, title in logged.items()}
 
-        sorted_titles = sorted(titles)
+        sorted_titles = sorted(self.exercise_ids)
 
         self.exercise_dropdown["values"] = sorted_titles
 
@@ -46,77 +76,108 @@ class LogsTab(ttk.Frame):
             self.exercise_dropdown.set(sorted_titles[0])
             self.show_graph(None)
 
+    def show_records(self, records):
+        if not records:
+            self.record_label.config(text="")
+            return
+        self.record_label.config(
+            text=f"PB: {records['max_weight']['value']} kg   "
+                 f"Est. 1RM: {records['best_1rm']['value']:.1f} kg   "
+                 f"Best volume: {records['best_volume']['value']:g} kg"
+        )
+
     def show_graph(self, event):
         exercise_name = self.exercise_dropdown.get()
         if not exercise_name:
             return
 
-        dates = []
-        weights = []
-
-        for workout in self.workouts:
-            
-            true_date = workout["id"]
-            
-            for exercise in workout["exercises"]:
-                if exercise["title"] == exercise_name:
-                    # Average weight of all sets
-                    if exercise["sets"]:
-                        average_weight = sum(s["weight"] for s in exercise["sets"]) / len(exercise["sets"])
-                        dates.append(true_date)
-                        weights.append(average_weight)
-
-        # Clear previous widgets
-        for widget in self.right_frame.winfo_children():
-            widget.destroy()
-
-        if not dates:
-            ttk.Label(self.right_frame, text="No data available for this exercise.").pack(pady=20)
+        exercise_id = self.exercise_ids[exercise_name]
+        window_days = RANGES[self.range_dropdown.get()]
+        max_points = self.graph.max_points()
+
+        # timed on the worker; the render is timed as ProgressGraph.show
+        @timed("tabs.logs_tab.LogsTab.load_graph")
+        def load():
+            # records and plot data are computed here; the graph's view cache makes show() cheap
+            load_view(exercise_id, window_days=window_days, max_points=max_points)
+            return get_records(exercise_id)
+
+        def show(records):
+            self.show_records(records)
+            # Average weight of all sets, per logged session (sorted by date)
+            self.graph.show(exercise_id, exercise_name, window_days=window_days, max_points=max_points)
+
+        self.tasks.submit(load, key="graph", on_done=show)
+
+
+    # ---------- PAST WORKOUTS ----------
+    def build_history(self):
+        # one row per workout, newest first, fetched a page at a time as the list is scrolled;
+        # a row's exercises are only looked up when it's expanded
+        columns = {"exercises": ("Exercises", 70), "sets": ("Sets", 50), "volume": ("Volume", 80), "duration": ("Time", 60)}
+        self.history = ttk.Treeview(self.history_frame, columns=list(columns))
+        self.history.heading("#0", text="Date")
+        self.history.column("#0", width=150)
+        for column, (text, width) in columns.items():
+            self.history.heading(column, text=text)
+            self.history.column(column, width=width, anchor="e")
+        self.history_scrollbar = ttk.Scrollbar(self.history_frame, orient="vertical", command=self.history.yview)
+        self.history.configure(yscrollcommand=self._on_history_scroll)
+        self.history.pack(side="left", fill="both", expand=True, padx=(10, 0), pady=10)
+        self.history_scrollbar.pack(side="left", fill="y", pady=10)
+        self.history.bind("<<TreeviewOpen>>", self._expand_workout)
+
+        self._history_stale = True
+        self._history_cursor = None     # id the last loaded page ended on
+        self._history_more = False
+        self._history_loading = False
+
+    def _history_shown(self):
+        return self.views.select() == str(self.history_frame)
+
+    def _refresh_history(self):
+        if not self._history_stale:
             return
-
-        #convert dates to datetime
-        dates = [datetime.fromisoformat(d) if isinstance(d, str) else d for d in dates]
-
-        #create graph
-        figure = Figure(figsize=(3, 5), dpi=80)
-
-        graph = figure.add_subplot(111)
-        graph.plot(dates, weights, marker=".", markersize = 5, linestyle="-", color="#4a7d8c")        
-
-        start_date = min(dates)
-        end_date = max(dates)
-        span = (end_date - start_date).days
-
-        # if data less than 12 weeks, start from the first date + 12 weeks
-        if span < 84:
-            end_date = start_date + timedelta(days=84)
-        
-        #else show last 12 weeks
-        else:
-            start_date = end_date - timedelta(days=84)
-        
-        #adjust starting x-value to be Monday
-        start_date = start_date - timedelta(days=start_date.weekday())
-
-        graph.set_xlim(start_date, end_date)
-
-        #pretty lines for each week
-        for i in range(13): 
-            week_line = start_date + timedelta(weeks=i)
-            graph.axvline(week_line, color="lightgray", linestyle="-", linewidth=0.4, zorder=0)
-
-        #x-axis labels: monday of each week
-        graph.xaxis.set_major_locator(mdates.WeekdayLocator(byweekday=mdates.MONDAY, interval=1))
-        graph.xaxis.set_major_formatter(mdates.DateFormatter("%b %d"))
-
-
-        graph.set_title(exercise_name)
-        graph.set_facecolor("#eae8e8")
-        figure.patch.set_facecolor("#dcdad5")
-        graph.grid(True,axis='y', zorder=-1)
-        figure.tight_layout()
-        figure.autofmt_xdate()
-
-        canvas = FigureCanvasTkAgg(figure, master=self.right_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+        self._history_stale = False
+        self.history.delete(*self.history.get_children())
+        self._history_cursor = None
+        self._history_more = True
+        self._load_history_page()
+
+    def _load_history_page(self):
+        self._history_loading = True
+        self.tasks.submit(page_summaries, self._history_cursor, key="history", on_done=self._add_history_rows)
+
+    def _add_history_rows(self, page):
+        rows, self._history_cursor = page
+        self._history_more = self._history_cursor is not None
+        self._history_loading = False
+        for row in rows:
+            duration = f"{row['duration']} min" if row["duration"] is not None else "-"
+            item = self.history.insert("", "end", iid=row["id"], text=row["id"].replace("T", "  ")[:17],
+                                       values=(row["exercises"], row["sets"], f"{row['volume']:g} kg", duration))
+            # placeholder child, so the row gets an expand arrow before its details are loaded
+            self.history.insert(item, "end", text="Loading...")
+        if not self.history.get_children():
+            self.history.insert("", "end", text="No workouts logged yet")
+
+    def _on_history_scroll(self, first, last):
+        self.history_scrollbar.set(first, last)
+        # near the end of what's loaded (or everything fits): fetch the next page
+        if float(last) > 0.9 and self._history_more and not self._history_loading:
+            self._load_history_page()
+
+    def _expand_workout(self, event):
+        workout_id = self.history.focus()
+        children = self.history.get_children(workout_id)
+        if len(children) != 1 or self.history.item(children[0], "text") != "Loading...":
+            return   # details already loaded
+
+        def show(details):
+            if not self.history.exists(workout_id):
+                return   # list was reloaded meanwhile
+            self.history.delete(*self.history.get_children(workout_id))
+            for title, sets, volume in details:
+                self.history.insert(workout_id, "end", text=title, values=("", sets, f"{volume:g} kg", ""))
+
+        self.tasks.submit(workout_details, workout_id, on_done=show)
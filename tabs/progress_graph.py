@@ -0,0 +1,214 @@
+import math
+import time
+from collections import deque
+from datetime import timedelta
+from functools import lru_cache
+
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from modules.series import get_series
+from modules.workout import history_version
+from utils.downsample import lttb
+from utils.instrument import timed
+from utils.tasks import data_lock
+
+# Selectable ranges in days, None = from the first session
+RANGES = {"Week": 7, "Month": 30, "12 Weeks": 84, "From start": None}
+# Default visible range: 12 weeks
+WINDOW_DAYS = 84
+# Never plot more points than this, whatever the canvas width
+MAX_POINTS = 400
+
+
+def _nice_limits(low, high):
+    """Round y-limits outwards so small data changes keep the same axes (and can be blitted)."""
+    span = max(high - low, abs(high), 1.0)
+    step = 10 ** math.floor(math.log10(span)) / 2
+    return math.floor(low / step) * step - step, math.ceil(high / step) * step + step
+
+@lru_cache(maxsize=32)
+def prepare_view(exercise_id, window_days, metric, version, length, max_points=MAX_POINTS):
+    """Plot data and axis limits for one exercise/range/metric.
+
+    Only the sessions inside the window (plus one on each side, so the line
+    runs off the edges) are read. "From start" (window_days None) switches
+    to the weekly or monthly rollup once there are more sessions than
+    points, and whatever is left is thinned to max_points with LTTB.
+    version and length only key the cache: they change whenever the series does.
+    Returns (x, y, (start, end), (low, high), weekly) or None if there is nothing to plot;
+    weekly tells whether Monday grid lines fit the range.
+    """
+    series = get_series(exercise_id)
+    if not series:
+        return None
+    dates = series["timestamp"]
+    start_date = dates[0].item()
+    end_date = dates[-1].item()
+
+    if window_days is None:
+        columns = {"timestamp": dates, metric: series[metric]}
+        for period in ("week", "month"):
+            if len(columns["timestamp"]) <= max_points:
+                break
+            columns = series.rollup(period)
+        x_dates, values = columns["timestamp"], columns[metric]
+        # a little room around the first and last point
+        pad = max(timedelta(days=1), (end_date - start_date) / 50)
+        start_date, end_date = start_date - pad, end_date + pad
+        weekly = (end_date - start_date).days <= 7 * ProgressGraph.WEEK_LINES
+    else:
+        # if data less than the window, start from the first date + window, else show the last window
+        if (end_date - start_date).days < window_days:
+            end_date = start_date + timedelta(days=window_days)
+        else:
+            start_date = end_date - timedelta(days=window_days)
+
+        #adjust starting x-value to be Monday
+        start_date = start_date - timedelta(days=start_date.weekday())
+
+        lo, hi = series.window(start_date, end_date)
+        lo, hi = max(lo - 1, 0), min(hi + 1, len(series))
+        x_dates, values = dates[lo:hi], series[metric][lo:hi]
+        weekly = True
+
+    x = mdates.date2num(x_dates)
+    keep = lttb(x, values, max_points)
+    x, values = x[keep], values[keep]
+    inside = values if window_days is None else values[(x >= mdates.date2num(start_date)) & (x <= mdates.date2num(end_date))]
+    if not inside.size:
+        inside = values
+    return x, values, (start_date, end_date), _nice_limits(inside.min(), inside.max()), weekly
+
+def load_view(exercise_id, metric="avg_weight", window_days=WINDOW_DAYS, max_points=MAX_POINTS):
+    """prepare_view for the current history. Can run on a worker thread to warm the cache before show()."""
+    series = get_series(exercise_id)
+    return prepare_view(exercise_id, window_days, metric, history_version(), len(series) if series else 0, max_points)
+
+
+class ProgressGraph:
+    """One persistent figure/canvas for the Logs tab.
+
+    The data line and title are animated artists: when the axes limits stay
+    the same, an update restores the cached background and blits just those
+    artists instead of redrawing the whole figure.
+    """
+
+    WEEK_LINES = 13
+
+    def __init__(self, master):
+        self.figure = Figure(figsize=(3, 5), dpi=80)
+        self.axes = self.figure.add_subplot(111)
+        self.line, = self.axes.plot([], [], marker=".", markersize=5, linestyle="-", color="#4a7d8c", animated=True)
+        self.title = self.axes.text(0.5, 1.02, "", transform=self.axes.transAxes, ha="center",
+                                    fontsize="large", animated=True)
+        self.message = self.axes.text(0.5, 0.5, "", transform=self.axes.transAxes, ha="center", va="center")
+
+        #pretty lines for each week, moved rather than recreated
+        self.week_lines = [
+            self.axes.axvline(0, color="lightgray", linestyle="-", linewidth=0.4, zorder=0)
+            for _ in range(self.WEEK_LINES)
+        ]
+
+        self._set_weekly_axis(True)
+        self.axes.tick_params(axis="x", labelrotation=30)
+
+        self.axes.set_facecolor("#eae8e8")
+        self.figure.patch.set_facecolor("#dcdad5")
+        self.axes.grid(True, axis="y", zorder=-1)
+        self.figure.tight_layout(rect=(0, 0, 1, 0.95))  # leave room for the title text
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+        self._background = None
+        self._limits = None
+        self.render_times = deque(maxlen=100)
+        self.full_draws = 0
+        self.blits = 0
+
+    def _set_weekly_axis(self, weekly):
+        if weekly:
+            #x-axis labels: monday of each week
+            self.axes.xaxis.set_major_locator(mdates.WeekdayLocator(byweekday=mdates.MONDAY, interval=1))
+            self.axes.xaxis.set_major_formatter(mdates.DateFormatter("%b %d"))
+        else:
+            # longer ranges: let matplotlib pick months/years
+            locator = mdates.AutoDateLocator(maxticks=8)
+            self.axes.xaxis.set_major_locator(locator)
+            self.axes.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        for week_line in self.week_lines:
+            week_line.set_visible(weekly)
+
+    def max_points(self):
+        """Points worth plotting: about one per pixel of the axes width."""
+        return max(2, min(MAX_POINTS, int(self.axes.bbox.width)))
+
+    def _on_draw(self, event):
+        # every full draw (incl. resizes) refreshes the background used for blitting
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        self.figure.draw_artist(self.line)
+        self.figure.draw_artist(self.title)
+
+    def _render(self, limits, full=False):
+        started = time.perf_counter()
+        if full or limits != self._limits or self._background is None:
+            self._limits = limits
+            if limits is not None:
+                (start, end), ylim, weekly = limits
+                self.axes.set_xlim(start, end)
+                self.axes.set_ylim(*ylim)
+                self._set_weekly_axis(weekly)
+                for i, week_line in enumerate(self.week_lines):
+                    x = mdates.date2num(start + timedelta(weeks=i))
+                    week_line.set_xdata([x, x])
+            self.canvas.draw()
+            self.full_draws += 1
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+            self.canvas.blit(self.figure.bbox)
+            self.blits += 1
+        self.render_times.append(time.perf_counter() - started)
+
+    @timed()
+    def show(self, exercise_id, title, metric="avg_weight", window_days=WINDOW_DAYS, max_points=None):
+        """Plot exercise_id over the last window_days (None: from start); returns False if it has no data."""
+        with data_lock:
+            view = load_view(exercise_id, metric, window_days, max_points or self.max_points())
+        if view is None:
+            self.show_message("No data available for this exercise.")
+            return False
+
+        x, y, xlim, ylim, weekly = view
+        had_message = bool(self.message.get_text())
+        self.message.set_text("")
+        self.line.set_data(x, y)
+        self.title.set_text(title)
+        self._render((xlim, ylim, weekly), full=had_message)
+        return True
+
+    def show_message(self, text):
+        self.line.set_data([], [])
+        self.title.set_text("")
+        self.message.set_text(text)
+        self._render(None, full=True)
+
+    def metrics(self):
+        """Render timings (ms) and cache counters, for profiling the Logs tab."""
+        times = [t * 1000 for t in self.render_times]
+        cache = prepare_view.cache_info()
+        return {
+            "renders": self.full_draws + self.blits,
+            "full_draws": self.full_draws,
+            "blits": self.blits,
+            "last_ms": times[-1] if times else 0.0,
+            "mean_ms": sum(times) / len(times) if times else 0.0,
+            "max_ms": max(times, default=0.0),
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
+        }
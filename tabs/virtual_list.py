@@ -0,0 +1,139 @@
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+
+class VirtualList(ttk.Frame):
+    """Listbox + scrollbar that only renders the rows currently visible.
+
+    The Listbox never holds more lines than fit on screen; scrolling moves an
+    offset into self.items and re-renders, and set_items() only touches the
+    rows whose text actually changed.
+    """
+
+    def __init__(self, parent, height=15, width=30, label=str, on_activate=None, empty_text=""):
+        super().__init__(parent)
+        self.label = label
+        self.on_activate = on_activate
+        self.empty_text = empty_text
+
+        self.items = []
+        self.offset = 0
+        self.rows = height
+        self._shown = []          # texts currently in the Listbox
+        self._selected = None     # index into self.items
+
+        self.listbox = tk.Listbox(self, height=height, width=width, exportselection=False)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.scrollbar.pack(side="left", fill="y")
+
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind("<Double-Button-1>", self._on_double_click)
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<MouseWheel>", lambda e: self._scroll(-1 if e.delta > 0 else 1))
+        self.listbox.bind("<Button-4>", lambda e: self._scroll(-1))
+        self.listbox.bind("<Button-5>", lambda e: self._scroll(1))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+
+
+    # ---------- PUBLIC ----------
+    def set_items(self, items, empty_text=None):
+        """Show items; the scroll position is kept only if the list is the same."""
+        same = len(items) == len(self.items) and all(a is b for a, b in zip(items, self.items))
+        self.items = list(items)
+        if empty_text is not None:
+            self.empty_text = empty_text
+        if not same:
+            self.offset = 0
+            self._selected = None
+        self._render()
+
+    def selected(self):
+        """The selected item, or None."""
+        if self._selected is None or self._selected >= len(self.items):
+            return None
+        return self.items[self._selected]
+
+
+    # ---------- RENDERING ----------
+    def _max_offset(self):
+        return max(0, len(self.items) - self.rows)
+
+    def _render(self):
+        self.offset = min(max(0, self.offset), self._max_offset())
+        if self.items:
+            texts = [self.label(item) for item in self.items[self.offset:self.offset + self.rows]]
+        else:
+            texts = [self.empty_text] if self.empty_text else []
+
+        # update only the rows that differ from what's on screen
+        for i, text in enumerate(texts):
+            if i >= len(self._shown):
+                self.listbox.insert(tk.END, text)
+            elif self._shown[i] != text:
+                self.listbox.delete(i)
+                self.listbox.insert(i, text)
+        if len(self._shown) > len(texts):
+            self.listbox.delete(len(texts), tk.END)
+        self._shown = texts
+
+        self.listbox.selection_clear(0, tk.END)
+        if self._selected is not None and self.offset <= self._selected < self.offset + len(texts):
+            self.listbox.selection_set(self._selected - self.offset)
+
+        if self.items:
+            first = self.offset / len(self.items)
+            last = min(1.0, (self.offset + self.rows) / len(self.items))
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+
+
+    # ---------- EVENTS ----------
+    def _yview(self, *args):
+        # same protocol as Listbox.yview, driven by the scrollbar
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.offset += step * self.rows if args[2] == "pages" else step
+        self._render()
+
+    def _scroll(self, step):
+        self.offset += step * 3
+        self._render()
+        return "break"
+
+    def _move_selection(self, step):
+        if not self.items:
+            return "break"
+        current = self._selected if self._selected is not None else self.offset - step
+        self._selected = min(max(0, current + step), len(self.items) - 1)
+        # keep the selected row in view
+        if self._selected < self.offset:
+            self.offset = self._selected
+        elif self._selected >= self.offset + self.rows:
+            self.offset = self._selected - self.rows + 1
+        self._render()
+        return "break"
+
+    def _on_resize(self, event):
+        line_height = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1
+        border = 2 * (int(self.listbox.cget("borderwidth")) + int(self.listbox.cget("highlightthickness")))
+        rows = max(1, (event.height - border) // line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self._render()
+
+    def _on_select(self, event):
+        selection = self.listbox.curselection()
+        if selection and self.items:
+            self._selected = self.offset + selection[0]
+
+    def _on_double_click(self, event):
+        index = self.offset + self.listbox.nearest(event.y)
+        if self.on_activate and index < len(self.items):
+            self._selected = index
+            self.on_activate(self.items[index])
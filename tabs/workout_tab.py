@@ -1,9 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 import datetime
 from modules.workout import *
-from tabs.logs_tab import LogsTab
+from modules.exercises import search_exercises
+from tabs.virtual_list import VirtualList
+from utils.tasks import TaskRunner, data_lock
+from utils.instrument import timed
 
 
 class WorkoutTab(ttk.Frame):
@@ -13,6 +15,9 @@ class WorkoutTab(ttk.Frame):
         self.current_workout = {}
         self.current_workout_list = []
 
+        # saving (and the PB check) runs in the background
+        self.tasks = TaskRunner(self)
+
         # title
         self.left_frame = ttk.Frame(self, width = 100, height = 300)
         self.left_frame.pack(side='left', fill = 'y', padx = 20, pady = 20, expand = False)
@@ -30,12 +35,59 @@ class WorkoutTab(ttk.Frame):
         self.current_exercise_list.pack(fill = "both", expand = True)
 
 
-        ttk.Button(
+        self.save_button = ttk.Button(
             self.left_frame, 
             text="Save Workout", 
-            command=lambda: [add_workout(self.current_workout), self.reset_workout_tab()]).pack(pady = 20)
+            command=self.finish_workout)
+        self.save_button.pack(pady = 20)
         
         
+    #save the workout and announce any new personal records
+    def finish_workout(self):
+        if not self.current_workout:
+            messagebox.showwarning("Nothing to save", "Add an exercise before saving the workout.")
+            return
+        # the task gets its own copy, the tab keeps what was typed until the save went through
+        workout = dict(self.current_workout, exercises=list(self.current_workout_list))
+        titles = {ex["exercise_id"]: ex["title"] for ex in self.current_workout_list}
+
+        def saved(records):
+            self.save_button.state(["!disabled"])
+            self.reset_workout_tab()
+            self.announce_records(records, titles)
+
+        def failed(error):
+            self.save_button.state(["!disabled"])
+            messagebox.showerror("Workout not saved", f"The workout couldn't be saved:\n{error}")
+
+        self.save_button.state(["disabled"])
+        self.tasks.submit(self._save_workout, workout, on_done=saved, on_error=failed)
+
+    #runs on the worker thread
+    @staticmethod
+    def _save_workout(workout):
+        # imported here: records pulls in numpy, which isn't needed until the first workout is saved
+        from modules.records import check_workout
+        records = check_workout(workout)
+        add_workout(workout)
+        return records
+
+    def announce_records(self, records, titles):
+        if records:
+            labels = {
+                "max_weight": "Heaviest weight",
+                "best_1rm": "Est. 1RM",
+                "best_volume": "Session volume",
+            }
+            lines = []
+            for pr in records:
+                if pr["kind"] == "reps_at_weight":
+                    what = f"Reps at {pr['weight']:g} kg: {pr['value']}"
+                else:
+                    what = f"{labels[pr['kind']]}: {pr['value']:.1f} kg"
+                lines.append(f"{titles.get(pr['exercise_id'], pr['exercise_id'])} - {what} (was {pr['previous']:g})")
+            messagebox.showinfo("New PB!", "\n".join(lines))
+
     #reset window after a workout is saved
     def reset_workout_tab(self):
 
@@ -55,25 +107,21 @@ class WorkoutTab(ttk.Frame):
         selector.geometry("200x300")
         selector.title("Select Exercises")
 
-        # load exercise dictionary
-        with open("data/exercises.json", mode = "r") as file:
-            self.exercises = json.load(file)
-        
-        #alphabetical order
-        self.exercises.sort(key=lambda x: x["title"].lower())
+        # load exercise dictionary in alphabetical order
+        with data_lock:
+            self.exercises = search_exercises(None)
 
-        #make listbox
-        exercise_list = tk.Listbox(selector, selectmode = "browse")
+        #make list, populated with titles from exercises file
+        exercise_list = VirtualList(selector, height = 10, width = 20, label = lambda ex: ex["title"])
         exercise_list.pack(expand = True, fill = "both", padx = 10, pady = 10)
-
-        #populate with titles from exercises file
-        for i in self.exercises:
-            exercise_list.insert(tk.END, i["title"])
+        exercise_list.set_items(self.exercises)
 
         def confirm_selection():
-            selected_index = exercise_list.curselection()
+            selected = exercise_list.selected()
+            if selected is None:
+                return
 
-            self.selection = self.exercises[selected_index[0]]
+            self.selection = selected
             selector.destroy()
             self.show_exercise_details()
 
@@ -81,12 +129,14 @@ class WorkoutTab(ttk.Frame):
         ttk.Button(selector, text = "Confirm", command = confirm_selection).pack(pady = 10)
 
 
+    @timed()
     def show_exercise_details(self, set_number=1, entries=None):
         if set_number < 1:
             set_number = 1
 
         ex = self.selection
-        previous_sets = get_previous_sets(ex["id"])
+        with data_lock:
+            previous_sets = get_previous_sets(ex["id"])
 
         # Read current entries before destroying frame
         preserved_values = []
@@ -188,10 +238,13 @@ class WorkoutTab(ttk.Frame):
             self.current_workout_list.append(current_exercise.copy())
 
             # Update current workout summary
+            now = datetime.now()
             self.current_workout = {
-                "id": datetime.now().isoformat(timespec="seconds"),
-                "date": datetime.now().strftime("%Y-%m-%d"),
+                "id": now.isoformat(timespec="seconds"),
+                "date": now.strftime("%Y-%m-%d"),
                 "exercises": self.current_workout_list,
+                # first exercise added; with created_at (set on save) it gives the workout's duration
+                "started_at": self.current_workout.get("started_at", now.isoformat(timespec="seconds")),
             }
 
             # Add exercise title to list
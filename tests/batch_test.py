@@ -0,0 +1,117 @@
+import unittest
+
+from utils.helpers import Batch
+from utils.json_handler import flush_pending
+from modules import archive, exercises, workout
+from tests.scratch import ScratchDataTest, make_workout
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.data = [{"id": "a", "n": 1}, {"id": "b", "n": 2}]
+        self.batch = Batch(self.data)
+
+    def test_changes(self):
+        self.batch.add({"id": "c", "n": 3})
+        self.batch.edit("a", {"n": 10})
+        self.batch.remove("b")
+        self.assertEqual([(item["id"], item["n"]) for item in self.batch.result()], [("a", 10), ("c", 3)])
+        self.assertEqual((set(self.batch.added), self.batch.edited, self.batch.removed), ({"c"}, {"a"}, {"b"}))
+
+    def test_original_is_untouched(self):
+        self.batch.edit("a", {"n": 10})
+        self.batch.remove("b")
+        self.assertEqual(self.data, [{"id": "a", "n": 1}, {"id": "b", "n": 2}])
+
+    def test_remove_then_add_back_is_an_edit(self):
+        self.batch.remove("a")
+        self.batch.add({"id": "a", "n": 5})
+        self.assertEqual((self.batch.added, self.batch.edited, self.batch.removed), ({}, {"a"}, set()))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self.batch.add({"id": "a"})
+        with self.assertRaises(ValueError):
+            self.batch.edit("zzz", {})
+        self.batch.remove("b")
+        with self.assertRaises(ValueError):
+            self.batch.remove("b")
+        self.assertFalse(Batch(self.data).changed())
+
+
+class DataBatchTest(ScratchDataTest):
+    """workout.batch() and exercises.batch() against a scratch data/ folder, in each storage mode."""
+
+    def setUp(self):
+        super().setUp()
+        workout.add_workouts([make_workout(1), make_workout(2), make_workout(3)])
+
+    def check_commit(self):
+        with workout.batch() as changes:
+            changes.remove(make_workout(1)["id"])
+            changes.edit(make_workout(2)["id"], {"date": "2025-01-22"})
+            changes.add(make_workout(4, weight=120.0))
+        expected = [workout.to_json(w) for w in workout.load_workout()]
+        self.assertEqual([w["id"] for w in expected], [make_workout(2)["id"], make_workout(3)["id"], make_workout(4)["id"]])
+        self.assertEqual(expected[0]["date"], "2025-01-22")
+        # what's on disk matches what was kept in memory
+        self.assertEqual(self.reloaded(), expected)
+        self.assertEqual(workout.get_previous_sets("squats"), [{"weight": 120.0, "reps": 5}])
+
+    def check_rollback(self):
+        before = [workout.to_json(w) for w in workout.load_workout()]
+        with self.assertRaises(RuntimeError):
+            with workout.batch() as changes:
+                changes.remove(make_workout(1)["id"])
+                changes.edit(make_workout(2)["id"], {"date": "2025-01-22"})
+                changes.add(make_workout(4))
+                raise RuntimeError("stop")
+        self.assertEqual([workout.to_json(w) for w in workout.load_workout()], before)
+        self.assertEqual(self.reloaded(), before)
+
+    def test_json_file(self):
+        self.check_commit()
+
+    def test_json_file_rollback(self):
+        self.check_rollback()
+
+    def test_journal(self):
+        self.assertEqual(workout.migrate_workouts_to_journal(), 3)
+        self.check_commit()
+        self.assertTrue(workout.WORKOUT_JOURNAL.exists())
+
+    def test_journal_rollback(self):
+        workout.migrate_workouts_to_journal()
+        self.check_rollback()
+
+    def test_archive(self):
+        self.assertEqual(workout.archive_workouts(), 3)
+        self.check_commit()
+        self.assertGreater(archive.delta_size(), 0)
+
+    def test_archive_rollback(self):
+        workout.archive_workouts()
+        self.check_rollback()
+
+    def test_exercises_rollback(self):
+        exercises.add_exercise(exercises.normalize_exercise_data({"title": "Squats"}))
+        with self.assertRaises(RuntimeError):
+            with exercises.batch() as changes:
+                changes.add(exercises.normalize_exercise_data({"title": "Lunges"}))
+                changes.edit("squats", {"title": "Back Squat"})
+                raise RuntimeError("stop")
+        self.assertEqual([ex["title"] for ex in exercises.search_exercises(None)], ["Squats"])
+
+    def test_exercises_commit(self):
+        exercises.add_exercise(exercises.normalize_exercise_data({"title": "Squats"}))
+        with exercises.batch() as changes:
+            changes.add(exercises.normalize_exercise_data({"title": "Lunges"}))
+            changes.edit("squats", {"title": "Back Squat"})
+        self.assertEqual([ex["title"] for ex in exercises.search_exercises("squat")], ["Back Squat"])
+        flush_pending()
+        self.reset()
+        self.assertEqual([ex["title"] for ex in exercises.load_exercises()], ["Back Squat", "Lunges"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+from modules import database, exercises
+from tests.scratch import ScratchDataTest
+
+LIBRARY = [
+    {"title": "Bench Press", "tags": ["chest", "push"], "description": "Press the bar from the chest"},
+    {"title": "Push-Ups", "tags": ["chest", "bodyweight"], "description": "Press yourself up from the floor"},
+    {"title": "Barbell Row", "tags": ["back", "pull"], "description": "Pull the bar to the stomach"},
+    {"title": "Deadlift", "tags": ["legs", "pull"], "description": "Lift the bar from the floor"},
+]
+QUERIES = ["press", "PULL", "floor", "deadlfit", "benhc", "row", "chest", "", None]
+
+
+class BackendSearchTest(ScratchDataTest):
+    """search_exercises gives the same answers with the JSON file and with the SQLite backend."""
+
+    def setUp(self):
+        super().setUp()
+        for data in LIBRARY:
+            exercises.add_exercise(exercises.normalize_exercise_data(data))
+
+    def results(self):
+        found = {q: [ex["id"] for ex in exercises.search_exercises(q)] for q in QUERIES}
+        found["tags"] = [ex["id"] for ex in exercises.search_exercises(None, all_tags=["chest"], no_tags=["push"])]
+        found["unsorted"] = [ex["id"] for ex in exercises.search_exercises("e", sort_alpha=False)]
+        return found
+
+    def test_same_results(self):
+        json_results = self.results()
+        self.assertEqual(json_results["press"], ["bench_press", "push-ups"])
+        self.assertEqual(json_results["deadlfit"], ["deadlift"])
+        database.import_json(exercises.load_exercises(), [])
+        self.assertTrue(database.enabled())
+        self.assertEqual(self.results(), json_results)
+
+    def test_database_writes_reach_the_index(self):
+        database.import_json(exercises.load_exercises(), [])
+        self.assertEqual([ex["id"] for ex in exercises.search_exercises("squat")], [])
+        exercises.add_exercise(exercises.normalize_exercise_data({"title": "Front Squat", "tags": ["legs"]}))
+        self.assertEqual([ex["id"] for ex in exercises.search_exercises("squat")], ["front_squat"])
+        exercises.edit_exercise("front_squat", {"title": "Goblet Squat"})
+        self.assertEqual([ex["title"] for ex in exercises.search_exercises("squat")], ["Goblet Squat"])
+        exercises.remove_exercise("front_squat")
+        self.assertEqual(exercises.search_exercises("squat"), [])
+        self.assertEqual(exercises.get_tag_counts()["pull"], 2)
@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.journal import append_journal, extend_journal, read_journal, tombstone, write_journal
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "workouts.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def ids(self):
+        return [item["id"] for item in read_journal(self.path)]
+
+    def test_fold(self):
+        extend_journal(self.path, [{"id": "a", "n": 1}, {"id": "b"}])
+        append_journal(self.path, {"id": "a", "n": 2})
+        append_journal(self.path, tombstone("b"))
+        self.assertEqual(read_journal(self.path), [{"id": "a", "n": 2}])
+
+    def test_base(self):
+        append_journal(self.path, tombstone("x"))
+        append_journal(self.path, {"id": "z"})
+        self.assertEqual(read_journal(self.path, base=[{"id": "x"}, {"id": "y"}]), [{"id": "y"}, {"id": "z"}])
+
+    def test_missing_file(self):
+        self.assertEqual(read_journal(self.path), [])
+
+    def test_torn_line_is_skipped(self):
+        self.path.write_text('{"id":"a"}\n{"id":"b","exer', encoding="utf-8")
+        self.assertEqual(self.ids(), ["a"])
+
+    def test_append_after_torn_line(self):
+        # the next record must not be glued onto the partial line
+        self.path.write_text('{"id":"a"}\n{"id":"b","exer', encoding="utf-8")
+        append_journal(self.path, {"id": "c"})
+        self.assertEqual(self.ids(), ["a", "c"])
+        self.assertEqual(self.path.read_text(encoding="utf-8"), '{"id":"a"}\n{"id":"c"}\n')
+
+    def test_append_after_torn_first_line(self):
+        self.path.write_text('{"id":"b","ex', encoding="utf-8")
+        extend_journal(self.path, [{"id": "c"}, {"id": "d"}])
+        self.assertEqual(self.ids(), ["c", "d"])
+
+    def test_write_journal_snapshot(self):
+        extend_journal(self.path, [{"id": "a"}, {"id": "b"}, tombstone("a")])
+        write_journal(self.path, read_journal(self.path))
+        self.assertEqual(self.path.read_text(encoding="utf-8"), '{"id":"b"}\n')
+        self.assertFalse(self.path.with_name(self.path.name + ".tmp").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
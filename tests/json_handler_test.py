@@ -0,0 +1,78 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils import json_handler
+from utils.json_handler import flush_pending, has_pending, load_json, save_json
+
+
+class JsonHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "data.json"
+        self.backup = Path(self.tmp.name) / "data.json.bak"
+        self.corrupt = Path(self.tmp.name) / "data.json.corrupt"
+
+    def tearDown(self):
+        flush_pending()
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        data = [{"id": "squat", "title": "Squat ü", "weight": 102.5, "tags": []}]
+        save_json(self.path, data)
+        self.assertEqual(load_json(self.path), data)
+        save_json(self.path, data, compact=True)
+        self.assertEqual(load_json(self.path), data)
+
+    def test_pretty_output_is_indented_by_4(self):
+        # the same with or without orjson installed
+        save_json(self.path, [{"a": 1}])
+        self.assertEqual(self.path.read_text(encoding="utf-8"), json.dumps([{"a": 1}], indent=4))
+
+    def test_missing_file(self):
+        self.assertEqual(load_json(self.path), [])
+
+    def test_previous_version_is_kept_as_backup(self):
+        save_json(self.path, [1])
+        save_json(self.path, [2])
+        self.assertEqual(json.loads(self.backup.read_text(encoding="utf-8")), [1])
+        self.assertFalse(self.path.with_name("data.json.tmp").exists())
+
+    def test_corrupt_file_falls_back_to_backup(self):
+        save_json(self.path, [1])
+        save_json(self.path, [2])
+        self.path.write_text('[{"id": "tor', encoding="utf-8")
+        self.assertEqual(load_json(self.path), [1])
+
+    def test_nothing_readable_is_moved_aside(self):
+        self.path.write_text("{oops", encoding="utf-8")
+        self.backup.write_text("[1,", encoding="utf-8")
+        self.assertEqual(load_json(self.path), [])
+        self.assertFalse(self.path.exists())
+        self.assertEqual(self.corrupt.read_text(encoding="utf-8"), "{oops")
+
+    def test_missing_file_with_corrupt_backup(self):
+        self.backup.write_text("[1,", encoding="utf-8")
+        self.assertEqual(load_json(self.path), [])
+        self.assertFalse(self.corrupt.exists())
+
+    def test_delayed_saves_are_coalesced(self):
+        writes = []
+        real_write = json_handler._write_atomic
+        json_handler._write_atomic = lambda path, data, compact=False: writes.append(data)
+        try:
+            save_json(self.path, [1], delay=60)
+            save_json(self.path, [2], delay=60)
+            self.assertTrue(has_pending(self.path))
+            # readers see the pending data before it's written
+            self.assertEqual(load_json(self.path), [2])
+            flush_pending(self.path)
+        finally:
+            json_handler._write_atomic = real_write
+        self.assertEqual(writes, [[2]])
+        self.assertFalse(has_pending(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import unittest
+
+from modules.models import SetColumns, Workout, to_json, workouts_from_json, workouts_to_json
+
+WORKOUTS = [
+    {
+        "id": "2025-01-06T18:00:00", "date": "2025-01-06",
+        "created_at": "2025-01-06T19:00:00", "last_updated": "2025-01-06T19:00:00",
+        "exercises": [
+            {"exercise_id": "squats", "title": "Squats", "sets": [{"weight": 100.0, "reps": 5}, {"weight": 62.3, "reps": 8}]},
+            # not packable: int weight, an extra key, reps out of range, no sets at all
+            {"exercise_id": "bench_press", "title": "Bench Press", "sets": [{"weight": 60, "reps": 8}]},
+            {"exercise_id": "plank", "sets": [{"weight": 0.0, "reps": 1, "seconds": 60}]},
+            {"exercise_id": "jump_rope", "sets": [{"weight": 0.0, "reps": 70000}]},
+            {"exercise_id": "running", "title": None, "note": "easy pace"},
+        ],
+    },
+    # keys left out, an unknown key, null where a value is expected
+    {"id": "2025-01-08T07:30:00", "exercises": [], "mood": "tired", "date": None},
+    {"id": "2025-01-10T07:30:00"},
+]
+
+
+class ModelsTest(unittest.TestCase):
+    def test_round_trip_is_lossless(self):
+        models = workouts_from_json(json.loads(json.dumps(WORKOUTS)))
+        self.assertEqual(workouts_to_json(models), WORKOUTS)
+
+    def test_exact_sets_are_packed(self):
+        workout = Workout.from_json(WORKOUTS[0])
+        squats, bench, plank, rope, _ = workout["exercises"]
+        self.assertIsInstance(squats["sets"], SetColumns)
+        self.assertEqual(squats["sets"].weights.typecode, "d")   # 62.3 doesn't fit a 32-bit float
+        self.assertEqual(squats["sets"][1]["weight"], 62.3)
+        for entry in (bench, plank, rope):
+            self.assertIsInstance(entry["sets"], list)
+        self.assertIs(type(bench["sets"][0]["weight"]), int)
+
+    def test_mapping_behaviour(self):
+        workout = Workout.from_json(WORKOUTS[1])
+        self.assertNotIn("created_at", workout)
+        self.assertIsNone(workout.get("last_updated"))
+        self.assertIsNone(workout["date"])
+        self.assertEqual(workout["mood"], "tired")
+        workout["created_at"] = "2025-01-08T08:00:00"
+        del workout["mood"]
+        with self.assertRaises(KeyError):
+            del workout["last_updated"]
+        self.assertEqual(to_json(workout),
+                         {"id": "2025-01-08T07:30:00", "date": None, "exercises": [], "created_at": "2025-01-08T08:00:00"})
+        self.assertEqual(len(workout), 4)
+
+    def test_set_columns(self):
+        sets = [{"weight": 20.0, "reps": 10}, {"weight": 22.5, "reps": 8}]
+        packed = SetColumns.pack(sets)
+        self.assertEqual(packed, sets)
+        self.assertEqual(packed[-1:], sets[-1:])
+        self.assertEqual(to_json(packed), sets)
+        self.assertIsNone(SetColumns.pack([{"weight": 20.0, "reps": -1}]))
+        self.assertIsNone(SetColumns.pack("not a list"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import unittest
+from pathlib import Path
+
+from utils import json_handler
+from utils.json_handler import load_json, save_json
+from modules import exercises, workout
+from tests.scratch import ScratchDataTest, make_workout
+
+
+class CrashedSaveTest(ScratchDataTest):
+    """A save that crashed after the .bak was written but before the new file was in place."""
+
+    def crash_mid_save(self, path):
+        # the state the old two-rename save could leave: only the .bak
+        os.replace(path, path.with_name(path.name + ".bak"))
+
+    def test_save_keeps_the_file_in_place(self):
+        path = Path("data/list.json")
+        save_json(path, [1])
+        renames = []
+        real_replace = os.replace
+        def replace(src, dst):
+            renames.append(Path(dst))
+            # path must never be renamed away, only replaced
+            self.assertNotEqual(Path(src), path)
+            return real_replace(src, dst)
+        json_handler.os.replace = replace
+        try:
+            save_json(path, [2])
+        finally:
+            json_handler.os.replace = real_replace
+        self.assertIn(path, renames)
+        self.assertEqual(load_json(path), [2])
+        self.assertEqual(load_json(path.with_name("list.json.bak")), [1])
+
+    def test_workouts_recovered_from_backup(self):
+        workout.add_workouts([make_workout(day) for day in range(1, 6)])
+        self.crash_mid_save(workout.WORKOUT_FILE)
+        self.reset()
+        self.assertEqual(len(workout.load_workout()), 5)
+        workout.add_workout(make_workout(6))
+        self.assertEqual(len(self.reloaded()), 6)
+        self.assertEqual(len(load_json(workout.WORKOUT_FILE.with_name("workouts.json.bak"))), 5)
+
+    def test_exercises_recovered_from_backup(self):
+        exercises.add_exercise(exercises.normalize_exercise_data({"title": "Squats"}))
+        exercises.add_exercise(exercises.normalize_exercise_data({"title": "Lunges"}))
+        json_handler.flush_pending()
+        self.crash_mid_save(exercises.EXERCISE_FILE)
+        self.reset()
+        self.assertEqual([ex["title"] for ex in exercises.load_exercises()], ["Squats", "Lunges"])
+
+    def test_new_install_starts_empty(self):
+        self.assertEqual(workout.load_workout(), [])
+        self.assertEqual(exercises.load_exercises(), [])
+        self.assertTrue(workout.WORKOUT_FILE.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.json_handler import flush_pending
+from utils.repository import invalidate
+from modules import archive, database, exercises, workout
+
+
+def make_workout(day, weight=100.0):
+    return {"id": f"2025-01-{day:02d}T18:00:00", "date": f"2025-01-{day:02d}",
+            "exercises": [{"exercise_id": "squats", "title": "Squats", "sets": [{"weight": weight, "reps": 5}]}]}
+
+
+class ScratchDataTest(unittest.TestCase):
+    """Runs each test in an empty scratch folder with its own data/, with the module caches reset."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        Path("data").mkdir()
+        self.reset()
+
+    def tearDown(self):
+        flush_pending()
+        os.chdir(self.cwd)
+        self.reset()
+        self.tmp.cleanup()
+
+    def reset(self):
+        """Forget everything loaded, as if the app was restarted."""
+        invalidate()
+        workout._latest_sets = None
+        archive._segment = None
+        exercises._indexes = None
+        # the connection is cached per thread under the relative DATABASE_FILE path
+        conn = getattr(database._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            database._local.conn = None
+
+    def reloaded(self):
+        flush_pending()
+        self.reset()
+        return [workout.to_json(w) for w in workout.load_workout()]
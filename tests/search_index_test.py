@@ -0,0 +1,53 @@
+import unittest
+
+from utils.search_index import SearchIndex
+
+EXERCISES = [
+    {"id": "bench", "title": "Bench Press", "tags": ["chest"], "description": "Press the bar from the chest"},
+    {"id": "row", "title": "Barbell Row", "tags": ["back"], "description": "Pull the bar to the stomach"},
+    {"id": "rowing", "title": "Rowing Machine", "tags": ["cardio"], "description": ""},
+    {"id": "rope", "title": "Jump Rope", "tags": ["cardio"], "description": "Skip over the rope"},
+    {"id": "leg_press", "title": "Leg Press", "tags": ["legs"], "description": "Push the sled with your legs"},
+    {"id": "deadlift", "title": "Deadlift", "tags": ["legs"], "description": "Lift the bar from the floor"},
+]
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex(
+            texts=lambda ex: [ex["title"], *ex["tags"], ex["description"]],
+            sort_key=lambda ex: ex["title"].lower(),
+            prefix_texts=lambda ex: [ex["title"]],
+        )
+        for ex in EXERCISES:
+            self.index.add(ex["id"], ex)
+
+    def ids(self, query, **kwargs):
+        return [ex["id"] for ex in self.index.search(query, **kwargs)]
+
+    def test_exact_in_title_order(self):
+        self.assertEqual(self.ids("row"), ["row", "rowing"])
+        self.assertEqual(self.ids("PRESS"), ["bench", "leg_press"])
+
+    def test_short_queries_are_not_fuzzy(self):
+        self.assertEqual(self.ids("abs"), [])
+
+    def test_typos(self):
+        self.assertEqual(self.ids("deadlfit"), ["deadlift"])
+        self.assertEqual(self.ids("benhc"), ["bench"])
+        self.assertEqual(self.ids("benhc", fuzzy=False), [])
+
+    def test_no_prefix_match_on_description(self):
+        # "stomx" is one typo off the start of "stomach", which is only in a description
+        self.assertEqual(self.ids("stomx"), [])
+        self.assertEqual(self.ids("stomacj"), ["row"])
+
+    def test_within_and_remove(self):
+        self.assertEqual(self.ids("row", within={"rowing"}), ["rowing"])
+        self.index.remove("rowing")
+        self.assertEqual(self.ids("row"), ["row"])
+        self.assertEqual(len(self.index), len(EXERCISES) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import numpy as np
+
+from modules import database, series, workout
+from modules.series import COLUMNS
+from tests.scratch import ScratchDataTest
+
+
+def _workout(day, hour, entries):
+    return {"id": f"2025-02-{day:02d}T{hour:02d}:00:00", "date": f"2025-02-{day:02d}",
+            "exercises": [{"exercise_id": exercise_id, "sets": [{"weight": w, "reps": r} for w, r in sets]}
+                          for exercise_id, sets in entries]}
+
+HISTORY = [
+    _workout(3, 18, [("squats", [(100.0, 5), (110.0, 3)]), ("bench", [(60.0, 8)])]),
+    # logged out of order, and the same exercise twice in one workout
+    _workout(1, 7, [("squats", [(90.0, 5)]), ("squats", [(95.0, 5), (97.5, 2)])]),
+    _workout(5, 18, [("bench", [(62.5, 8), (62.5, 6)]), ("row", [])]),
+]
+
+
+class SeriesBackendTest(ScratchDataTest):
+    """The Logs series are the same from the JSON history and from the per-exercise SQL query."""
+
+    def setUp(self):
+        super().setUp()
+        workout.add_workouts(HISTORY)
+
+    def snapshot(self):
+        series.rebuild()
+        result = {}
+        for exercise_id in ("squats", "bench", "row", "never_logged"):
+            found = series.get_series(exercise_id)
+            result[exercise_id] = None if found is None else {c: found[c].tolist() for c in COLUMNS}
+        return result
+
+    def test_same_series(self):
+        from_json = self.snapshot()
+        self.assertEqual(from_json["squats"]["avg_weight"], [90.0, 96.25, 105.0])
+        self.assertIsNone(from_json["row"])
+        database.import_json([], workout.load_workout())
+        self.assertEqual(self.snapshot(), from_json)
+
+    def test_query_uses_the_exercise_index(self):
+        database.import_json([], workout.load_workout())
+        plan = database.connect().execute(
+            "EXPLAIN QUERY PLAN SELECT seq FROM workout_exercises WHERE exercise_id = ?", ("squats",)).fetchall()
+        self.assertIn("idx_workout_exercises_exercise", str(plan))
+
+    def test_added_workout_extends_queried_series(self):
+        database.import_json([], workout.load_workout())
+        series.rebuild()
+        self.assertEqual(len(series.get_series("squats")), 3)
+        self.assertIsNone(series.get_series("row"))
+        workout.add_workout(_workout(7, 18, [("squats", [(120.0, 1)]), ("row", [(50.0, 10)]), ("bench", [(65.0, 5)])]))
+        self.assertEqual(series.get_series("squats")["top_set"].tolist()[-1], 120.0)
+        self.assertEqual(series.get_series("row")["volume"].tolist(), [500.0])
+        # bench wasn't queried before the add: the query sees the new workout once
+        self.assertEqual(len(series.get_series("bench")), 3)
+        self.assertTrue(np.all(np.diff(series.get_series("bench")["timestamp"].astype(np.int64)) > 0))
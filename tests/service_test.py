@@ -0,0 +1,61 @@
+import contextlib
+import io
+import json
+from pathlib import Path
+from unittest import mock
+
+import cli
+from modules import service, workout
+from tests.scratch import ScratchDataTest, make_workout
+
+
+class ImportTest(ScratchDataTest):
+    def write(self, name, text):
+        Path(name).write_text(text, encoding="utf-8")
+        return name
+
+    def run_cli(self, *args):
+        err = io.StringIO()
+        # the worker has to outlive the command here, other tests still use it
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(err), \
+                mock.patch.object(cli.tasks, "shutdown"):
+            code = cli.main(list(args))
+        return code, err.getvalue()
+
+    def test_json_and_jsonl(self):
+        self.write("in.json", json.dumps([make_workout(1), make_workout(2)]))
+        self.write("in.jsonl", json.dumps(make_workout(3)) + "\n\n" + json.dumps(make_workout(4)) + "\n")
+        self.assertEqual(service.import_workouts("in.json"), 2)
+        self.assertEqual(service.import_workouts("in.jsonl"), 2)
+        self.assertEqual(len(self.reloaded()), 4)
+
+    def test_csv(self):
+        self.write("in.csv", "workout_id,exercise_id,title,weight,reps\n"
+                             "2025-01-01,squats,Squats,100,5\n2025-01-01,squats,Squats,100,5\n")
+        self.assertEqual(service.import_workouts("in.csv"), 1)
+        self.assertEqual(len(workout.load_workout()[0]["exercises"][0]["sets"]), 2)
+
+    def test_malformed_json_is_an_error_and_left_alone(self):
+        self.write("in.json", '[{"id": "2025-01-01T')
+        with self.assertRaises(ValueError):
+            service.import_workouts("in.json")
+        self.assertTrue(Path("in.json").exists())
+        self.assertFalse(Path("in.json.corrupt").exists())
+        self.assertEqual(self.run_cli("import", "in.json")[0], 1)
+
+    def test_missing_file(self):
+        with self.assertRaisesRegex(ValueError, "no such file"):
+            service.import_workouts("nope.json")
+
+    def test_records_are_validated(self):
+        self.write("in.json", json.dumps([make_workout(1), {"date": "2025-01-02"}]))
+        with self.assertRaisesRegex(ValueError, "record 2"):
+            service.import_workouts("in.json")
+        self.write("in.jsonl", json.dumps(make_workout(1)) + "\n" + '{"id": "x", "exercises": [{"sets": []}]}\n')
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            service.import_workouts("in.jsonl")
+        code, err = self.run_cli("import", "in.jsonl")
+        self.assertEqual(code, 1)
+        self.assertIn("line 2", err)
+        # nothing was added
+        self.assertEqual(workout.load_workout(), [])
@@ -1,3 +1,4 @@
+import copy
 from datetime import datetime
 
 def add(data, new_item):
@@ -11,6 +12,21 @@ def add(data, new_item):
     data.append(new_item)
     return data, new_item
 
+def add_many(data, new_items):
+    """Add several new items at once, checking ids against a set instead of a scan per item."""
+    ids = {item["id"] for item in data}
+    for new_item in new_items:
+        if new_item["id"] in ids:
+            raise ValueError(f"Item with id '{new_item['id']}' already exists.")
+        ids.add(new_item["id"])
+
+    now = datetime.now().isoformat(timespec="seconds")
+    for new_item in new_items:
+        new_item["created_at"] = now
+        new_item["last_updated"] = now
+    data.extend(new_items)
+    return data, new_items
+
 def edit(data, item_id, updates):
     """Edit an existing item by id and update timestamp."""
     for item in data:
@@ -26,3 +42,78 @@ def remove(data, item_id):
     if len(updated) == len(data):
         raise ValueError(f"No item found with id '{item_id}'")
     return updated, item_id
+
+
+class Batch:
+    """Many adds, edits and removes on a working copy of a list, with id lookups through a dict.
+
+    The list passed in and its items are never modified: an item is copied
+    the first time it's edited. result() is the new list to save, and
+    added/edited/removed hold the ids that changed, for updating indexes.
+    """
+
+    def __init__(self, data, copy_item=copy.copy):
+        self._items = list(data)
+        self._index = {item["id"]: i for i, item in enumerate(self._items)}
+        self._copy = copy_item
+        self._own = set()      # ids of items that are ours to change (added or already copied)
+        self.added = {}        # id -> item, in the order they were added
+        self.edited, self.removed = set(), set()
+
+    def __contains__(self, item_id):
+        return item_id in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, item_id):
+        i = self._index.get(item_id)
+        return None if i is None else self._items[i]
+
+    def add(self, new_item):
+        if new_item["id"] in self._index:
+            raise ValueError(f"Item with id '{new_item['id']}' already exists.")
+        now = datetime.now().isoformat(timespec="seconds")
+        new_item["created_at"] = now
+        new_item["last_updated"] = now
+        self._index[new_item["id"]] = len(self._items)
+        self._items.append(new_item)
+        self._own.add(new_item["id"])
+        if new_item["id"] in self.removed:
+            # removed and added back: to the saved list that's a replacement
+            self.removed.discard(new_item["id"])
+            self.edited.add(new_item["id"])
+        else:
+            self.added[new_item["id"]] = new_item
+        return new_item
+
+    def edit(self, item_id, updates):
+        i = self._index.get(item_id)
+        if i is None:
+            raise ValueError(f"No item found with id '{item_id}'")
+        if item_id not in self._own:
+            self._items[i] = self._copy(self._items[i])
+            self._own.add(item_id)
+        item = self._items[i]
+        item.update(updates)
+        item["last_updated"] = datetime.now().isoformat(timespec="seconds")
+        if item_id not in self.added:
+            self.edited.add(item_id)
+        return item_id
+
+    def remove(self, item_id):
+        i = self._index.pop(item_id, None)
+        if i is None:
+            raise ValueError(f"No item found with id '{item_id}'")
+        self._items[i] = None   # leaves a hole, result() skips it
+        self._own.discard(item_id)
+        self.edited.discard(item_id)
+        if self.added.pop(item_id, None) is None:
+            self.removed.add(item_id)
+        return item_id
+
+    def changed(self):
+        return bool(self.added or self.edited or self.removed)
+
+    def result(self):
+        return [item for item in self._items if item is not None]
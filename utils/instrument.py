@@ -0,0 +1,175 @@
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+# Session reports (.txt) and raw profiles (.prof, e.g. for snakeviz) go here
+PROFILE_DIR = Path("profiles")
+# Histogram bucket upper bounds in ms, plus one bucket for anything slower
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+TOP = 25
+
+
+class Metric:
+    """Call count, total/max time and a latency histogram for one timed name."""
+
+    __slots__ = ("calls", "total", "max", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.calls += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        self.buckets[next((i for i, bound in enumerate(BUCKETS_MS) if ms <= bound), len(BUCKETS_MS))] += 1
+
+
+_metrics = {}                  # name -> Metric
+_lock = threading.Lock()
+_session = None                # {"started", "profiles": [cProfile.Profile]} while profiling
+_thread_profile = threading.local()
+
+
+# ---------- TIMING ----------
+def record(name, seconds):
+    with _lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = Metric()
+        metric.record(seconds)
+
+@contextmanager
+def timer(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+def timed(name=None):
+    """Decorator counting calls and timing func, under name (default: module.qualname)."""
+    def decorate(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+def metrics():
+    """{name: {"calls", "total_ms", "mean_ms", "max_ms", "histogram"}} collected so far."""
+    with _lock:
+        return {
+            name: {
+                "calls": m.calls,
+                "total_ms": m.total,
+                "mean_ms": m.total / m.calls,
+                "max_ms": m.max,
+                "histogram": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + ["slower"], m.buckets)),
+            }
+            for name, m in _metrics.items()
+        }
+
+
+# ---------- PROFILING ----------
+def enabled():
+    """Profiling requested with --profile or GYMLOG_PROFILE=1."""
+    return "--profile" in sys.argv or bool(os.environ.get("GYMLOG_PROFILE"))
+
+def start():
+    """Profile (cProfile) and trace allocations (tracemalloc) from now until stop() or exit."""
+    global _session
+    if _session is not None:
+        return
+    profile = cProfile.Profile()
+    _session = {"started": datetime.now(), "profiles": [profile]}
+    tracemalloc.start(10)
+    profile.enable()
+    atexit.register(stop)
+
+def profile_call(func, *args, **kwargs):
+    """Run func, profiled when a session is active. For threads other than the one that called start()."""
+    if _session is None:
+        return func(*args, **kwargs)
+    profile = getattr(_thread_profile, "profile", None)
+    if profile is None:
+        profile = _thread_profile.profile = cProfile.Profile()
+        with _lock:
+            _session["profiles"].append(profile)
+    try:
+        profile.enable()
+    except ValueError:
+        # another profiler already covers this thread (Python 3.12+ profiles all threads at once)
+        return func(*args, **kwargs)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.disable()
+
+def report(stats=None, snapshot=None):
+    """Text report: timed names by total time, then the profile and allocation hot spots if given."""
+    out = io.StringIO()
+    out.write(f"{'name':<60} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}  histogram\n")
+    rows = sorted(metrics().items(), key=lambda item: item[1]["total_ms"], reverse=True)
+    for name, m in rows:
+        histogram = " ".join(str(n) for n in m["histogram"].values())
+        out.write(f"{name:<60} {m['calls']:>7} {m['total_ms']:>10.1f} {m['mean_ms']:>9.2f} {m['max_ms']:>9.1f}  {histogram}\n")
+    out.write(f"(histogram buckets: {', '.join(f'<={b}' for b in BUCKETS_MS)}, slower; ms)\n")
+
+    if stats is not None:
+        out.write(f"\nTop {TOP} functions by cumulative time:\n")
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(TOP)
+
+    if snapshot is not None:
+        out.write(f"Top {TOP} allocation sites still held:\n")
+        for stat in snapshot.statistics("lineno")[:TOP]:
+            out.write(f"  {stat}\n")
+        current, peak = tracemalloc.get_traced_memory()
+        out.write(f"Traced memory: {current / 1e6:.1f} MB now, {peak / 1e6:.1f} MB peak\n")
+    return out.getvalue()
+
+def stop():
+    """End the profiling session and write its report; returns the report path (None if not profiling)."""
+    global _session
+    if _session is None:
+        return None
+    session, _session = _session, None
+    for profile in session["profiles"]:
+        profile.disable()
+    snapshot = tracemalloc.take_snapshot()
+
+    stats = None
+    for profile in session["profiles"]:
+        profile.create_stats()
+        if profile.stats:   # pstats refuses a profile that never ran
+            stats = pstats.Stats(profile) if stats is None else stats.add(profile)
+
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    name = session["started"].strftime("session-%Y%m%d-%H%M%S")
+    if stats is not None:
+        stats.dump_stats(PROFILE_DIR / f"{name}.prof")
+    path = PROFILE_DIR / f"{name}.txt"
+    path.write_text(report(stats, snapshot), encoding="utf-8")
+    tracemalloc.stop()
+    print(f"Profile report written to {path}")
+    return path
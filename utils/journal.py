@@ -0,0 +1,92 @@
+import json
+import os
+from pathlib import Path
+
+# A journal is a JSON-Lines file with one record per line.
+# A record replaces any earlier record with the same id, and a record with
+# DELETED set removes it. Folding the lines in order gives the current list.
+DELETED = "_deleted"
+
+
+def _dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def tombstone(item_id):
+    """Journal record that marks item_id as removed."""
+    return {"id": item_id, DELETED: True}
+
+
+def read_journal(path, base=()):
+    """Read a journal and fold it into a list of items, in first-seen order.
+
+    The lines are folded over the items of base, if given (e.g. a snapshot the journal continues).
+    """
+    path = Path(path)
+    items = {item["id"]: item for item in base}
+    if not path.exists():
+        return list(items.values())
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # torn write from a crash mid-append, skip it
+                continue
+            if record.get(DELETED):
+                items.pop(record["id"], None)
+            else:
+                items[record["id"]] = record
+    return list(items.values())
+
+
+def append_journal(path, record):
+    """Append a single record and make sure it reached the disk."""
+    extend_journal(path, [record])
+
+
+def _trim_torn_tail(f):
+    # A crash mid-append can leave a partial last line. Appending after it would
+    # glue the next record onto that line and read_journal would skip both, so
+    # cut the file back to its last complete line first.
+    end = f.seek(0, os.SEEK_END)
+    if end == 0:
+        return
+    f.seek(end - 1)
+    if f.read(1) == b"\n":
+        return
+    pos = end
+    while pos > 0:
+        step = min(4096, pos)
+        pos -= step
+        f.seek(pos)
+        newline = f.read(step).rfind(b"\n")
+        if newline != -1:
+            f.truncate(pos + newline + 1)
+            return
+    f.truncate(0)
+
+
+def extend_journal(path, records):
+    """Append several records with a single write and fsync."""
+    with open(path, "a+b") as f:
+        _trim_torn_tail(f)
+        f.write("".join(_dumps(record) + "\n" for record in records).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_journal(path, items):
+    """Rewrite the journal as a compact snapshot, one item per line."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write(_dumps(item) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
@@ -1,19 +1,220 @@
+import atexit
 import json
+import os
+import shutil
+import threading
+import time
 from pathlib import Path
 
+from utils.instrument import timed
+
+# Optional fast/binary codecs, the stdlib json module is used without them
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Files with these extensions are stored as MessagePack instead of JSON
+MSGPACK_SUFFIXES = {".msgpack", ".mpk"}
+
+# Saves waiting to be flushed: path -> {"data": obj, "due": monotonic deadline}
+_pending = {}
+_pending_lock = threading.Lock()
+_write_lock = threading.Lock()
+_flush_listeners = []
+_scheduler = None
+
+
+def _backup_path(path):
+    return path.with_name(path.name + ".bak")
+
+# ---------- CODECS ----------
+def _is_msgpack(path):
+    return path.suffix in MSGPACK_SUFFIXES
+
+def _require_msgpack(path):
+    if msgpack is None:
+        raise RuntimeError(f"{path} is a MessagePack file, install msgpack to use it (pip install msgpack)")
+
+def encode(path, data, compact=False):
+    """Bytes to store data in path: MessagePack by extension, else JSON (indented unless compact)."""
+    if _is_msgpack(path):
+        _require_msgpack(path)
+        return msgpack.packb(data, use_bin_type=True)
+    # orjson only for compact output: it can't indent by 4, and pretty files
+    # (e.g. exercises.json) should look the same whichever library is installed
+    if orjson is not None and compact:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass  # a type orjson doesn't handle, let json have a go
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+
+def decode(path, raw):
+    """Inverse of encode(); raises ValueError for corrupt or truncated data."""
+    if _is_msgpack(path):
+        _require_msgpack(path)
+        return msgpack.unpackb(raw, raw=False)
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+def _read(path, codec_path):
+    with open(path, "rb") as f:
+        return decode(codec_path, f.read())
+
+@timed()
 def load_json(path):
-    # Loads JSON data, or returns an empty list if file doesn't exist or is empty.
+    # Loads JSON (or MessagePack, by extension) data, or returns an empty list if file doesn't exist.
+    # A truncated/corrupt file falls back to the last good snapshot (<name>.bak).
     path = Path(path)
-    if not path.exists():
+    with _pending_lock:
+        if path in _pending:
+            return _pending[path]["data"]
+
+    backup = _backup_path(path)
+    if not path.exists() and not backup.exists():
         return []
+
+    for candidate in (path, backup):
+        if not candidate.exists():
+            continue
+        try:
+            return _read(candidate, path)
+        except ValueError:  # covers JSON/MessagePack decode errors and bad UTF-8
+            continue
+
+    # Nothing readable: move the broken file aside so the next save can't destroy it
+    # (if only the .bak is left and it's corrupt too, there's nothing to move)
+    if path.exists():
+        path.replace(path.with_name(path.name + ".corrupt"))
+    return []
+
+def _fsync_dir(path):
+    # Make the rename itself durable where the OS allows opening directories
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return []
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
-def save_json(path, data):
-    # Saves Python object to JSON file with pretty formatting.
+def _keep_backup(path):
+    # The current version becomes <name>.bak while path itself stays in place, so a
+    # crash at any point leaves a complete file under its own name.
+    backup = _backup_path(path)
+    staged = backup.with_name(backup.name + ".tmp")
+    try:
+        staged.unlink(missing_ok=True)
+        os.link(path, staged)   # the old file's contents survive the swap below
+    except OSError:
+        shutil.copyfile(path, staged)   # no hard links on this file system
+    os.replace(staged, backup)
+
+def _write_atomic(path, data, compact=False):
+    # Write to a temp file, fsync it, then swap it in with a single rename.
+    tmp = path.with_name(path.name + ".tmp")
+    raw = encode(path, data, compact)
+    with _write_lock:
+        with open(tmp, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            _keep_backup(path)
+        os.replace(tmp, path)
+        _fsync_dir(path)
+
+def restore_backup(path):
+    """Put <name>.bak back in place if path is missing; returns True if path exists afterwards.
+
+    For "create the file if it's missing" code paths, which would otherwise
+    start from an empty file and lose the backup on the next save.
+    """
     path = Path(path)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    if path.exists():
+        return True
+    backup = _backup_path(path)
+    if not backup.exists():
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    with _write_lock:
+        shutil.copyfile(backup, tmp)
+        os.replace(tmp, path)
+        _fsync_dir(path)
+    return True
+
+@timed()
+def save_json(path, data, delay=None, compact=False):
+    # Saves Python object to JSON file with pretty formatting (no whitespace if compact), atomically.
+    # .msgpack/.mpk paths are written as MessagePack instead.
+    # With delay (seconds), a burst of saves to the same file is coalesced into one write.
+    path = Path(path)
+    if delay is None:
+        with _pending_lock:
+            _pending.pop(path, None)
+        _write_atomic(path, data, compact)
+        return
+
+    with _pending_lock:
+        already_scheduled = path in _pending
+        _pending[path] = {"data": data, "due": time.monotonic() + delay, "compact": compact}
+    if not already_scheduled:
+        _schedule(delay, lambda: _flush_when_due(path))
+
+def _schedule(delay, callback):
+    if _scheduler is not None:
+        _scheduler(delay, callback)
+        return
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+
+def _flush_when_due(path):
+    with _pending_lock:
+        entry = _pending.get(path)
+        if entry is None:
+            return
+        remaining = entry["due"] - time.monotonic()
+    if remaining > 0:
+        # saved again since this flush was scheduled, wait for the burst to end
+        _schedule(remaining, lambda: _flush_when_due(path))
+    else:
+        flush_pending(path)
+
+@timed()
+def flush_pending(path=None):
+    """Write out delayed saves now, for one path or all of them."""
+    with _pending_lock:
+        paths = [Path(path)] if path is not None else list(_pending)
+        entries = [(p, _pending.pop(p)) for p in paths if p in _pending]
+    for p, entry in entries:
+        _write_atomic(p, entry["data"], entry["compact"])
+        for listener in _flush_listeners:
+            listener(p, entry["data"])
+
+def has_pending(path):
+    with _pending_lock:
+        return Path(path) in _pending
+
+def set_flush_scheduler(scheduler):
+    """Run delayed flushes through scheduler(delay_seconds, callback) instead of a timer thread.
+
+    The Tk app passes its after() here so flushes happen on the UI thread.
+    """
+    global _scheduler
+    _scheduler = scheduler
+
+def add_flush_listener(listener):
+    """Call listener(path, data) after a delayed save has been written."""
+    _flush_listeners.append(listener)
+
+
+atexit.register(flush_pending)
@@ -0,0 +1,88 @@
+import os
+from itertools import count
+from pathlib import Path
+from utils.json_handler import load_json, save_json, add_flush_listener
+from utils.instrument import timed
+
+# Shared in-memory cache of parsed data files.
+# path -> {"stamp": (mtime_ns, size), "data": parsed object, "generation": int}
+_cache = {}
+_generations = count(1)
+
+
+def file_stamp(path):
+    # Cheap fingerprint of the file on disk, None if it doesn't exist.
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+@timed()
+def load_cached(path, loader=load_json):
+    """Return the parsed contents of path, re-parsing only when its mtime/size changed.
+
+    The same object is handed to every caller, so treat it as shared state.
+    """
+    key = Path(path)
+    stamp = file_stamp(key)
+    entry = _cache.get(key)
+    if entry and entry["stamp"] == stamp:
+        return entry["data"]
+
+    data = loader(key)
+    _cache[key] = {
+        "stamp": stamp,
+        "data": data,
+        "generation": next(_generations),
+    }
+    return data
+
+
+def remember(path, data):
+    """Record data as the current contents of path without re-reading the file."""
+    key = Path(path)
+    entry = _cache.get(key)
+    _cache[key] = {
+        "stamp": file_stamp(key),
+        "data": data,
+        "generation": entry["generation"] if entry else next(_generations),
+    }
+
+
+def store(path, data, saver=save_json):
+    """Save data to path and keep the cache in sync with what was written."""
+    try:
+        saver(path, data)
+    except Exception:
+        invalidate(path)
+        raise
+    remember(path, data)
+
+
+def generation(path):
+    """Counter that changes every time path is (re)parsed from disk.
+
+    Derived indexes compare against it to know when to rebuild.
+    """
+    entry = _cache.get(Path(path))
+    return entry["generation"] if entry else 0
+
+
+def invalidate(path=None):
+    """Drop the cached data for path, or for every file if path is None."""
+    if path is None:
+        _cache.clear()
+    else:
+        _cache.pop(Path(path), None)
+
+
+def _on_flush(path, data):
+    # A delayed save just hit the disk; if it's what we cache, don't re-parse it
+    entry = _cache.get(Path(path))
+    if entry and entry["data"] is data:
+        entry["stamp"] = file_stamp(path)
+
+
+add_flush_listener(_on_flush)
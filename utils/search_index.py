@@ -0,0 +1,216 @@
+import re
+from collections import Counter
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def _padded_trigrams(text):
+    return _grams(f"  {text} ", 3)
+
+def _edit_distance(a, b, limit):
+    """Optimal string alignment distance (typos incl. swapped letters), or limit + 1 if above limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        if min(row) > limit:
+            return limit + 1
+        prev2, prev = prev, row
+    return prev[-1]
+
+
+class SearchIndex:
+    """In-memory n-gram index for live substring search with typo tolerance.
+
+    Every text of an item (e.g. title, tags, description) is indexed by its
+    1-, 2- and 3-grams, so a query only has to intersect a few posting sets
+    and check the survivors. Fuzzy matches come from padded trigrams and an
+    edit-distance check on individual words, and only run when the exact
+    matches are few. Words of prefix_texts (e.g. the title) also match a
+    typo'd query by their start, so "benhc" finds "bench". Results come back
+    ordered by sort_key, followed by fuzzy matches.
+    """
+
+    FUZZY_MIN_LENGTH = 4     # shorter queries match too many words at distance 1
+    FUZZY_MAX_EXACT = 5      # with this many exact matches, typos aren't looked for
+    FUZZY_CANDIDATES = 50
+
+    def __init__(self, texts, sort_key, prefix_texts=None):
+        self._texts = texts          # item -> list of searchable strings
+        self._sort_key = sort_key    # item -> sort key
+        self._prefix_texts = prefix_texts or (lambda item: [])
+        self._items = {}             # id -> item
+        self._lower = {}             # id -> lowercased texts
+        self._words = {}             # id -> (words, words matched by prefix), for the fuzzy check
+        self._keys = {}              # id -> sort key, cached
+        self._postings = {}          # gram -> set of ids
+        self._fuzzy_postings = {}    # padded trigram -> set of ids
+        self._sorted = None          # ids in sort order, built lazily
+
+    def __len__(self):
+        return len(self._items)
+
+    def _item_grams(self, texts):
+        grams, fuzzy = set(), set()
+        for text in texts:
+            for n in (1, 2, 3):
+                grams |= _grams(text, n)
+            for word in _WORD.findall(text):
+                fuzzy |= _padded_trigrams(word)
+        return grams, fuzzy
+
+    def add(self, item_id, item):
+        if item_id in self._items:
+            self.remove(item_id)
+        texts = [t.lower() for t in self._texts(item) if t]
+        self._items[item_id] = item
+        self._lower[item_id] = texts
+        self._words[item_id] = (
+            {word for text in texts for word in _WORD.findall(text)},
+            {word for text in self._prefix_texts(item) if text for word in _WORD.findall(text.lower())},
+        )
+        self._keys[item_id] = self._sort_key(item)
+        grams, fuzzy = self._item_grams(texts)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(item_id)
+        for gram in fuzzy:
+            self._fuzzy_postings.setdefault(gram, set()).add(item_id)
+        self._sorted = None
+
+    def remove(self, item_id):
+        if item_id not in self._items:
+            return
+        grams, fuzzy = self._item_grams(self._lower.pop(item_id))
+        for postings, keys in ((self._postings, grams), (self._fuzzy_postings, fuzzy)):
+            for gram in keys:
+                ids = postings.get(gram)
+                if ids is not None:
+                    ids.discard(item_id)
+                    if not ids:
+                        del postings[gram]
+        del self._items[item_id]
+        del self._words[item_id]
+        del self._keys[item_id]
+        self._sorted = None
+
+    update = add
+
+    def _ordered(self, ids):
+        return sorted(ids, key=self._keys.__getitem__)
+
+    def all(self):
+        if self._sorted is None:
+            self._sorted = self._ordered(self._items)
+        return [self._items[i] for i in self._sorted]
+
+    def _exact(self, q):
+        grams = _grams(q, 3) if len(q) >= 3 else {q}
+        postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:]) if postings else set()
+        if len(q) <= 3:
+            return candidates
+        return {i for i in candidates if any(q in text for text in self._lower[i])}
+
+    def _fuzzy(self, q, exclude):
+        limit = 1 if len(q) < 8 else 2
+        grams = _padded_trigrams(q)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._fuzzy_postings.get(gram, ()))
+        # an edit changes at most 3 trigrams (and a prefix loses its last one), so
+        # items sharing fewer can't be within the limit
+        least = len(grams) - 3 * limit - 1
+        candidates = [item_id for item_id, count in shared.most_common()
+                      if count >= least and item_id not in exclude]
+        scored = []
+        distance = {}   # word -> distance to q; items share most of their words
+        def check(word):
+            if word not in distance:
+                distance[word] = _edit_distance(q, word, limit)
+            return distance[word]
+        # only the candidates sharing the most trigrams get the edit-distance check
+        for item_id in candidates[:self.FUZZY_CANDIDATES]:
+            words, prefix_words = self._words[item_id]
+            distances = [check(word) for word in words]
+            distances += [check(word[:len(q)]) for word in prefix_words if len(word) > len(q)]
+            best = min(distances, default=limit + 1)
+            if best <= limit:
+                scored.append((best, self._keys[item_id], item_id))
+        return [item_id for _, _, item_id in sorted(scored)]
+
+    def search(self, query, fuzzy=True, within=None):
+        """Items whose texts contain query (case-insensitive), then close typo matches.
+
+        within optionally restricts the results to a set of ids.
+        """
+        q = (query or "").lower()
+        if not q:
+            return self.all() if within is None else [self._items[i] for i in self._ordered(within)]
+        exact = self._exact(q)
+        if within is not None:
+            exact &= within
+        ids = self._ordered(exact)
+        if fuzzy and len(q) >= self.FUZZY_MIN_LENGTH and len(exact) < self.FUZZY_MAX_EXACT:
+            ids += [i for i in self._fuzzy(q, exact) if within is None or i in within]
+        return [self._items[i] for i in ids]
+
+
+class TagIndex:
+    """Inverted tag -> ids index with boolean filtering through set operations."""
+
+    def __init__(self):
+        self._ids = {}     # tag -> set of ids
+        self._tags = {}    # id -> tags, to undo an item on remove
+
+    def add(self, item_id, tags):
+        if item_id in self._tags:
+            self.remove(item_id)
+        self._tags[item_id] = set(tags)
+        for tag in self._tags[item_id]:
+            self._ids.setdefault(tag, set()).add(item_id)
+
+    def remove(self, item_id):
+        for tag in self._tags.pop(item_id, ()):
+            ids = self._ids[tag]
+            ids.discard(item_id)
+            if not ids:
+                del self._ids[tag]
+
+    update = add
+
+    def tags(self):
+        return sorted(self._ids)
+
+    def counts(self):
+        """{tag: number of items with it}, sorted by tag."""
+        return {tag: len(self._ids[tag]) for tag in sorted(self._ids)}
+
+    def ids(self, tag):
+        return self._ids.get(tag, set())
+
+    def filter(self, all_of=(), any_of=(), none_of=()):
+        """Ids having every tag in all_of, at least one of any_of and none of none_of.
+
+        Returns None when no tag condition is given, meaning "no filtering".
+        """
+        if not (all_of or any_of or none_of):
+            return None
+        if all_of:
+            postings = sorted((self.ids(tag) for tag in all_of), key=len)
+            result = set(postings[0]).intersection(*postings[1:])
+        else:
+            result = set(self._tags)
+        if any_of:
+            result &= set().union(*(self.ids(tag) for tag in any_of))
+        if none_of:
+            result -= set().union(*(self.ids(tag) for tag in none_of))
+        return result
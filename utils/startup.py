@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Cold start should stay under this, from the first import of this module until the window is idle
+STARTUP_BUDGET_MS = 1000
+
+_started = time.perf_counter()
+_timings = []   # (label, seconds) in the order they happened
+
+
+def enabled():
+    """Startup report requested with --startup-report or GYMLOG_STARTUP_REPORT=1."""
+    return "--startup-report" in sys.argv or bool(os.environ.get("GYMLOG_STARTUP_REPORT"))
+
+@contextmanager
+def timed(label):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings.append((label, time.perf_counter() - start))
+
+def elapsed():
+    return time.perf_counter() - _started
+
+def report(total=None, budget_ms=STARTUP_BUDGET_MS):
+    """Text report of every timed step plus the total against the budget."""
+    total_ms = (elapsed() if total is None else total) * 1000
+    lines = ["Startup timings:"]
+    lines += [f"  {label:<40} {seconds * 1000:8.1f} ms" for label, seconds in _timings]
+    status = "OK" if total_ms <= budget_ms else "OVER BUDGET"
+    lines.append(f"  {'total until ready':<40} {total_ms:8.1f} ms  (budget {budget_ms} ms: {status})")
+    return "\n".join(lines)
@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.instrument import profile_call
+
+# One worker thread: the data modules keep unlocked in-memory caches, so background
+# work runs one task at a time, in the order it was submitted.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gymlog-worker")
+
+# Held by every background task. UI code that touches the data modules while a task
+# may be running takes it too: both changes (e.g. add_exercise from a dialog) and
+# reads, which can rebuild shared caches and index files (e.g. get_previous_sets).
+data_lock = threading.RLock()
+
+
+def _locked(func, args, kwargs):
+    with data_lock:
+        return profile_call(func, *args, **kwargs)
+
+def run_in_background(func, *args, **kwargs):
+    """Queue func on the worker without a callback, for housekeeping the UI doesn't wait on."""
+    return _executor.submit(_locked, func, args, kwargs)
+
+def shutdown():
+    """Wait for submitted work (e.g. a workout being saved) before the app exits."""
+    _executor.shutdown(wait=True)
+
+
+class TaskRunner:
+    """Runs functions on the background worker and hands results back on the Tk loop.
+
+    Results are polled with widget.after(), so callbacks always run on the UI
+    thread. A task submitted with a key supersedes the previous task with that
+    key: it's cancelled if it hasn't started yet, otherwise its result is
+    dropped. While anything is in flight the widget shows a busy cursor.
+    """
+
+    POLL_MS = 15
+
+    def __init__(self, widget, on_busy=None):
+        self.widget = widget
+        self.on_busy = on_busy or (lambda busy: widget.configure(cursor="watch" if busy else ""))
+        self._latest = {}      # key -> newest future for that key
+        self._in_flight = set()
+
+    def submit(self, func, *args, key=None, on_done=None, on_error=None, **kwargs):
+        """Run func(*args, **kwargs) in the background, then on_done(result) on the UI thread.
+
+        If func raises and on_error is given, on_error(exception) runs instead.
+        """
+        previous = self._latest.get(key) if key is not None else None
+        if previous is not None:
+            previous.cancel()
+        future = _executor.submit(_locked, func, args, kwargs)
+        if key is not None:
+            self._latest[key] = future
+        self._in_flight.add(future)
+        self._update_busy()
+        self.widget.after(self.POLL_MS, self._poll, future, key, on_done, on_error)
+        return future
+
+    def busy(self):
+        return bool(self._in_flight)
+
+    def _update_busy(self):
+        self.on_busy(self.busy())
+
+    def _poll(self, future, key, on_done, on_error):
+        if not future.done():
+            self.widget.after(self.POLL_MS, self._poll, future, key, on_done, on_error)
+            return
+        self._in_flight.discard(future)
+        self._update_busy()
+
+        if key is not None:
+            if self._latest.get(key) is not future:
+                return  # superseded by a newer request
+            del self._latest[key]
+        if future.cancelled():
+            return
+        if on_error is not None and future.exception() is not None:
+            on_error(future.exception())
+            return
+        # result() re-raises a failed task here, so Tk reports it like any callback error
+        result = future.result()
+        if on_done is not None:
+            on_done(result)